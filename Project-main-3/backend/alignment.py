@@ -0,0 +1,57 @@
+"""
+Preference and location alignment between two students.
+
+Kept free of other backend imports so the scoring modules (records,
+compatibility_matrix) can use it without importing matching; matching
+re-exports both functions.
+"""
+
+
+def compute_preference_alignment(pref1: str, pref2: str) -> float:
+    """
+    Compute alignment score between two study preferences.
+    
+    Args:
+        pref1: Study preference for student 1
+        pref2: Study preference for student 2
+    
+    Returns:
+        Alignment score (1.0 if same, 0.0 if different)
+    """
+    if not pref1 or not pref2:
+        return 0.0
+    
+    return 1.0 if pref1.strip() == pref2.strip() else 0.0
+
+
+def compute_location_alignment(loc1: str, loc2: str) -> float:
+    """
+    Compute alignment score between two location preferences.
+    
+    Args:
+        loc1: Location preference for student 1 ("In-person", "Virtual", "Either")
+        loc2: Location preference for student 2
+    
+    Returns:
+        Alignment score:
+        - 1.0 if both are same and not "Either"
+        - 0.8 if one is "Either" and other is specific
+        - 0.5 if both are "Either"
+        - 0.0 if incompatible (In-person vs Virtual)
+    """
+    if not loc1 or not loc2:
+        return 0.0
+    
+    loc1 = loc1.strip()
+    loc2 = loc2.strip()
+    
+    if loc1 == loc2:
+        if loc1 == "Either":
+            return 0.5
+        return 1.0
+    
+    if loc1 == "Either" or loc2 == "Either":
+        return 0.8
+    
+    # Incompatible preferences
+    return 0.0
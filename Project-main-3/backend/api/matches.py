@@ -100,7 +100,12 @@ def trigger_matching():
         matcher = GroupMatcher(
             scorer=scorer,
             min_group_size=current_app.config.get('MIN_GROUP_SIZE', 3),
-            max_group_size=current_app.config.get('MAX_GROUP_SIZE', 5)
+            max_group_size=current_app.config.get('MAX_GROUP_SIZE', 5),
+            cache=getattr(current_app, 'match_cache', None),
+            sparse_min_size=current_app.config.get('CLUSTERING_SPARSE_MIN_SIZE', 2000),
+            n_neighbors=current_app.config.get('CLUSTERING_NEIGHBORS', 15),
+            storage=current_app.config.get('CLUSTERING_STORAGE', 'dense'),
+            measure_memory=current_app.config.get('CLUSTERING_MEASURE_MEMORY', False)
         )
         
         orchestrator = MatchOrchestrator(firebase_service, email_service, matcher)
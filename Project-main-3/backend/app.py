@@ -10,7 +10,9 @@ import os
 
 from config import Config
 from db import get_database
-from matching import match_students
+from matching import iter_match_students, place_submission
+from match_cache import MatchCache
+from scorer import MatchingWeights
 from qc.quality_control import validate_submission, sanitize_submission
 from aggregation.aggregate import aggregate_feedback
 from emailer import get_email_transporter, send_match_notification
@@ -46,6 +48,21 @@ db = get_database(Config)
 # Initialize email transporter
 email_transporter = get_email_transporter(Config)
 
+# Cache of matching results, reused when /match is re-run on unchanged courses
+match_cache = MatchCache(max_bytes=Config.MATCH_CACHE_MAX_BYTES) if Config.MATCH_CACHE_MAX_BYTES > 0 else None
+app.match_cache = match_cache
+
+# Score weights; each course's scorer is compiled from these at match time
+matching_weights = MatchingWeights(
+    availability=Config.AVAILABILITY_WEIGHT,
+    preference=Config.PREFERENCE_WEIGHT,
+    location=Config.LOCATION_WEIGHT
+)
+course_matching_weights = {
+    course: MatchingWeights.from_dict(weights, base=matching_weights)
+    for course, weights in Config.MATCHING_COURSE_WEIGHTS.items()
+}
+
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -53,6 +70,33 @@ def health():
     return jsonify({"status": "ok", "message": "GroupMeet API is running"}), 200
 
 
+def notify_group_members(group, submissions_by_id):
+    """
+    Send a match notification to every member of an auto-matched group.
+    
+    Args:
+        group: Match record
+        submissions_by_id: Course submissions keyed by id, used for member emails
+    """
+    match_url = f"{Config.BASE_URL}/dashboard"
+    
+    for student in group['group_members']:
+        student_sub = submissions_by_id.get(student['id'])
+        if student_sub:
+            student_email = student_sub.get('email', f"{student_sub.get('pennkey', 'student')}@upenn.edu")
+        else:
+            student_email = student.get('email', 'student@upenn.edu')
+        
+        send_match_notification(
+            email_transporter,
+            student_email,
+            student['name'],
+            match_url,
+            group['group_members'],
+            Config
+        )
+
+
 @app.route('/api/submit', methods=['POST'])
 @require_auth
 def submit():
@@ -80,12 +124,10 @@ def submit():
             return jsonify({"error": "Not authenticated"}), 401
         
         # Check if student already has a submission for this course
-        existing_submissions = db.get_all_submissions()
-        for sub in existing_submissions:
-            if sub.get('pennkey') == pennkey and sub.get('course') == data.get('course'):
-                return jsonify({
-                    "error": f"You already have a submission for {data.get('course')}"
-                }), 400
+        if db.find_submission(pennkey, data.get('course')):
+            return jsonify({
+                "error": f"You already have a submission for {data.get('course')}"
+            }), 400
         
         # Build submission data with auth info
         # Handle email: if pennkey already contains @, use it as-is (normalized); otherwise append @upenn.edu
@@ -126,49 +168,49 @@ def submit():
         
         logger.info(f"Submission saved: {saved_id} for {pennkey} in {sanitized.get('course')}")
         
-        # Automatic matching: Check if we should run matching for this course
+        # Automatic matching: place the newcomer into an open group or the waiting pool
+        # instead of re-matching (and re-emailing) the whole course
         course = sanitized.get('course')
-        course_submissions = [s for s in db.get_all_submissions() if s.get('course') == course]
-        
-        if len(course_submissions) >= Config.MIN_GROUP_SIZE:
-            logger.info(f"Auto-matching triggered for {course} ({len(course_submissions)} students)")
-            try:
-                matched_groups, unmatched = match_students(
-                    course_submissions,
-                    min_group_size=Config.MIN_GROUP_SIZE,
-                    max_group_size=Config.MAX_GROUP_SIZE
+        course_submissions = db.get_submissions_by_course(course)
+        
+        try:
+            course_matches = db.get_matches_by_course(course)
+            matched_ids = {sid for match in course_matches for sid in match.get('student_ids', [])}
+            submissions_by_id = {s.get('id'): s for s in course_submissions}
+            waiting = [
+                s for s in course_submissions
+                if s.get('id') not in matched_ids and s.get('id') != saved_id
+            ]
+            
+            updated_groups, new_groups = place_submission(
+                sanitized,
+                course_matches,
+                waiting,
+                submissions_by_id,
+                min_group_size=Config.MIN_GROUP_SIZE,
+                max_group_size=Config.MAX_GROUP_SIZE,
+                weights=course_matching_weights.get(course, matching_weights),
+                engine=Config.MATCHING_ENGINE
+            )
+            
+            # Save affected groups and notify their members
+            for group in updated_groups:
+                db.update_match(group['id'], group)
+                notify_group_members(group, submissions_by_id)
+                logger.info(f"Added {saved_id} to match {group['id']} for {course}")
+            
+            for match_id, group in zip(db.save_matches(new_groups), new_groups):
+                notify_group_members(group, submissions_by_id)
+                logger.info(f"Created match {match_id} for {course}")
+            
+            if updated_groups or new_groups:
+                logger.info(
+                    f"Auto-matching complete: {len(updated_groups)} groups updated, "
+                    f"{len(new_groups)} groups created"
                 )
-                
-                # Save matches and send notifications
-                for group in matched_groups:
-                    match_id = db.save_match(group)
-                    
-                    for student in group['group_members']:
-                        student_id = student['id']
-                        match_url = f"{Config.BASE_URL}/dashboard"
-                        
-                        # Get student email from submission
-                        student_sub = db.get_submission(student_id)
-                        if student_sub:
-                            student_email = student_sub.get('email', f"{student_sub.get('pennkey', 'student')}@upenn.edu")
-                        else:
-                            student_email = student.get('email', 'student@upenn.edu')
-                        
-                        send_match_notification(
-                            email_transporter,
-                            student_email,
-                            student['name'],
-                            match_url,
-                            group['group_members'],
-                            Config
-                        )
-                    
-                    logger.info(f"Created match {match_id} for {course}")
-                
-                logger.info(f"Auto-matching complete: {len(matched_groups)} groups created")
-            except Exception as e:
-                logger.error(f"Error in auto-matching: {e}")
-                # Don't fail the submission if matching fails
+        except Exception as e:
+            logger.error(f"Error in auto-matching: {e}")
+            # Don't fail the submission if matching fails
         
         return jsonify({
             "status": "ok",
@@ -235,48 +277,70 @@ def match():
                 "error": f"Not enough submissions (need at least {Config.MIN_GROUP_SIZE})"
             }), 400
         
-        # Run matching algorithm
-        matched_groups, unmatched = match_students(
+        # Run matching algorithm, saving and notifying each course's groups as
+        # soon as it is matched instead of waiting for every course
+        matching_stats = {}
+        match_stream = iter_match_students(
             submissions,
             min_group_size=Config.MIN_GROUP_SIZE,
-            max_group_size=Config.MAX_GROUP_SIZE
+            max_group_size=Config.MAX_GROUP_SIZE,
+            engine=Config.MATCHING_ENGINE,
+            workers=Config.MATCHING_WORKERS,
+            parallel_min_course_size=Config.MATCHING_PARALLEL_MIN_COURSE_SIZE,
+            refine_time_budget=Config.MATCHING_REFINE_TIME_BUDGET,
+            stats=matching_stats,
+            cache=match_cache,
+            weights=matching_weights,
+            course_weights=course_matching_weights,
+            partition_min_course_size=Config.MATCHING_PARTITION_MIN_COURSE_SIZE,
+            max_bucket_size=Config.MATCHING_MAX_BUCKET_SIZE
         )
         
         # Save matches to database and generate URLs
         match_results = []
-        for group in matched_groups:
-            # Save match
-            match_id = db.save_match(group)
+        unmatched = []
+        pending_groups = []
+        for kind, _, payload in match_stream:
+            if kind == "group":
+                pending_groups.append(payload)
+                continue
             
-            # Generate match URLs for each student
-            for student in group['group_members']:
-                student_id = student['id']
-                match_url = f"{Config.BASE_URL}/results/{student_id}"
-                
-                # Send notification (simulated email)
-                send_match_notification(
-                    email_transporter,
-                    student['email'],
-                    student['name'],
-                    match_url,
-                    group['group_members'],
-                    Config
-                )
+            # A course is complete: save its groups in one batch
+            unmatched.extend(payload)
+            match_ids = db.save_matches(pending_groups)
             
-            match_results.append({
-                "match_id": match_id,
-                "course": group['course'],
-                "group_size": group['group_size'],
-                "student_count": len(group['student_ids'])
-            })
+            for match_id, group in zip(match_ids, pending_groups):
+                # Generate match URLs for each student
+                for student in group['group_members']:
+                    student_id = student['id']
+                    match_url = f"{Config.BASE_URL}/results/{student_id}"
+                    
+                    # Send notification (simulated email)
+                    send_match_notification(
+                        email_transporter,
+                        student['email'],
+                        student['name'],
+                        match_url,
+                        group['group_members'],
+                        Config
+                    )
+                
+                match_results.append({
+                    "match_id": match_id,
+                    "course": group['course'],
+                    "group_size": group['group_size'],
+                    "student_count": len(group['student_ids'])
+                })
+            pending_groups = []
         
-        logger.info(f"Generated {len(matched_groups)} matches, {len(unmatched)} unmatched")
+        logger.info(f"Generated {len(match_results)} matches, {len(unmatched)} unmatched")
         
         return jsonify({
             "status": "ok",
-            "matches_created": len(matched_groups),
+            "matches_created": len(match_results),
             "unmatched_count": len(unmatched),
             "matches": match_results,
+            "matching_stats": matching_stats,
             "unmatched_students": [
                 {
                     "id": s.get('id'),
@@ -302,8 +366,7 @@ def get_my_groups():
             return jsonify({"error": "Not authenticated"}), 401
         
         # Get all submissions for this user
-        all_submissions = db.get_all_submissions()
-        user_submissions = [s for s in all_submissions if s.get('pennkey') == pennkey]
+        user_submissions = db.get_submissions_by_pennkey(pennkey)
         
         # Get all matches for this user
         groups = []
@@ -350,8 +413,7 @@ def get_my_submissions():
             return jsonify({"error": "Not authenticated"}), 401
         
         # Get all submissions for this user
-        all_submissions = db.get_all_submissions()
-        user_submissions = [s for s in all_submissions if s.get('pennkey') == pennkey]
+        user_submissions = db.get_submissions_by_pennkey(pennkey)
         
         return jsonify({
             "status": "ok",
@@ -379,7 +441,7 @@ def get_group_details(match_id):
             return jsonify({"error": "Group not found"}), 404
         
         # Verify user is in this group
-        user_submissions = [s for s in db.get_all_submissions() if s.get('pennkey') == pennkey]
+        user_submissions = db.get_submissions_by_pennkey(pennkey)
         user_submission_ids = {s.get('id') for s in user_submissions}
         
         if not any(sid in match.get('student_ids', []) for sid in user_submission_ids):
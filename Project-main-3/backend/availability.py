@@ -0,0 +1,216 @@
+"""
+Availability encoding for the matching algorithm.
+
+Availability slot strings (e.g. "Monday 2-4pm", "Mon_PM") are interned into a
+per-course slot vocabulary so each student's availability can be stored as an
+integer bitmask. Overlap between two students then costs a couple of integer
+operations instead of building two sets.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class AvailabilityEncoder:
+    """Interns availability slots and encodes availability lists as bitmasks."""
+
+    def __init__(self):
+        self.slot_ids: Dict[str, int] = {}
+        self.slots: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def intern(self, slot: str) -> int:
+        """
+        Get the bit position for a slot, adding it to the vocabulary if needed.
+
+        Args:
+            slot: Availability time block string
+
+        Returns:
+            Bit position of the slot
+        """
+        slot_id = self.slot_ids.get(slot)
+        if slot_id is None:
+            slot_id = len(self.slots)
+            self.slot_ids[slot] = slot_id
+            self.slots.append(slot)
+        return slot_id
+
+    def encode(self, availability: Optional[Iterable[str]]) -> int:
+        """
+        Encode an availability list as a bitmask.
+
+        Args:
+            availability: List of availability time blocks
+
+        Returns:
+            Integer bitmask with one bit set per distinct slot
+        """
+        mask = 0
+        for slot in availability or []:
+            mask |= 1 << self.intern(slot)
+        return mask
+
+    def decode(self, mask: int) -> List[str]:
+        """
+        Decode a bitmask back into slot strings (in vocabulary order).
+
+        Args:
+            mask: Availability bitmask produced by this encoder
+
+        Returns:
+            List of availability time blocks
+        """
+        return [self.slots[slot_id] for slot_id in iter_slot_ids(mask)]
+
+
+def iter_slot_ids(mask: int) -> Iterator[int]:
+    """
+    Iterate the slot ids (bit positions) set in an availability bitmask.
+
+    Args:
+        mask: Availability bitmask
+
+    Yields:
+        Slot ids in ascending order
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def mask_overlap(mask1: int, mask2: int) -> float:
+    """
+    Compute Jaccard similarity between two availability bitmasks.
+
+    Equivalent to compute_availability_overlap on the decoded lists.
+
+    Args:
+        mask1: Availability bitmask for student 1
+        mask2: Availability bitmask for student 2
+
+    Returns:
+        Overlap score between 0 and 1
+    """
+    if not mask1 or not mask2:
+        return 0.0
+
+    return (mask1 & mask2).bit_count() / (mask1 | mask2).bit_count()
+
+
+class SlotIndex:
+    """Inverted index from availability slot to the students available in it."""
+
+    def __init__(self, masks: List[int]):
+        """
+        Build posting lists for a course.
+
+        Args:
+            masks: Availability bitmask for each student, by student index
+        """
+        self.postings: Dict[int, List[int]] = {}
+        for student_index, mask in enumerate(masks):
+            for slot_id in iter_slot_ids(mask):
+                self.postings.setdefault(slot_id, []).append(student_index)
+
+    def students_in_slot(self, slot_id: int) -> List[int]:
+        """
+        Get the students available in a slot.
+
+        Args:
+            slot_id: Slot id from the course's AvailabilityEncoder
+
+        Returns:
+            Student indices in ascending order
+        """
+        return self.postings.get(slot_id, [])
+
+    def overlapping(self, mask: int) -> Set[int]:
+        """
+        Get every student sharing at least one slot with an availability mask.
+
+        Args:
+            mask: Availability bitmask to look up
+
+        Returns:
+            Set of student indices
+        """
+        students: Set[int] = set()
+        for slot_id in iter_slot_ids(mask):
+            students.update(self.postings.get(slot_id, ()))
+        return students
+
+
+# Default number of ranked meeting times suggested per group
+DEFAULT_MEETING_TIMES = 3
+
+
+def rank_meeting_slots(masks: List[int], top_k: int = DEFAULT_MEETING_TIMES) -> List[Tuple[int, int]]:
+    """
+    Rank slots as meeting times for a group by how many members are available.
+
+    Slots every member shares are found by ANDing the masks; when there are
+    not enough of those, the remaining slots are ranked by per-slot member
+    counts. Ties go to the slot interned first.
+
+    Args:
+        masks: Availability bitmask of each group member
+        top_k: Maximum number of slots to return
+
+    Returns:
+        Up to top_k (slot_id, members available) pairs, best first
+    """
+    if not masks or top_k <= 0:
+        return []
+
+    common = masks[0]
+    for mask in masks[1:]:
+        common &= mask
+
+    ranked = [(slot_id, len(masks)) for slot_id in iter_slot_ids(common)][:top_k]
+    if len(ranked) == top_k:
+        return ranked
+
+    counts: Dict[int, int] = {}
+    for mask in masks:
+        for slot_id in iter_slot_ids(mask & ~common):
+            counts[slot_id] = counts.get(slot_id, 0) + 1
+    partial = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return ranked + partial[:top_k - len(ranked)]
+
+
+def suggest_meeting_times(availabilities: List[Optional[Iterable[str]]],
+                          top_k: int = DEFAULT_MEETING_TIMES) -> List[str]:
+    """
+    Suggest ranked meeting times for a group from its members' availability.
+
+    Args:
+        availabilities: Availability list of each group member
+        top_k: Maximum number of times to return
+
+    Returns:
+        Up to top_k availability slots, best first
+    """
+    encoder = AvailabilityEncoder()
+    masks = [encoder.encode(availability) for availability in availabilities]
+    return rank_meeting_times(encoder, masks, top_k)
+
+
+def rank_meeting_times(encoder: AvailabilityEncoder, masks: List[int],
+                       top_k: int = DEFAULT_MEETING_TIMES) -> List[str]:
+    """
+    Suggest ranked meeting times for a group from already-encoded availability.
+
+    Lets a course encode availability once and rank every group from its
+    members' masks. Ties go to the slot the encoder interned first.
+
+    Args:
+        encoder: Encoder the masks were built with
+        masks: Availability bitmask of each group member
+        top_k: Maximum number of times to return
+
+    Returns:
+        Up to top_k availability slots, best first
+    """
+    return [encoder.slots[slot_id] for slot_id, _ in rank_meeting_slots(masks, top_k)]
@@ -0,0 +1,224 @@
+"""
+Benchmark the matching engines on synthetic workloads.
+
+Run from the project root, e.g.:
+
+    python -m backend.benchmarks.run --sizes 100 1000 --engines matching.greedy clustering
+
+Results are written as JSON so runs can be compared.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+# The Flask app imports backend modules by their flat names (e.g. `matching`)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from matching import MATCHING_ENGINES, compute_group_metrics, match_students  # noqa: E402
+from backend.benchmarks.workload import WorkloadConfig, generate_submissions  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_ENGINES = ['matching.greedy', 'clustering']
+
+# An engine run returns (groups as lists of submission dicts, unmatched count,
+# each group's score under the engine's own objective)
+EngineRun = Callable[[List[Dict[str, Any]], int, int], Tuple[List[List[Dict[str, Any]]], int, List[float]]]
+
+# What each engine optimizes, recorded next to its own objective in the results
+ENGINE_OBJECTIVES = {
+    'clustering': "GroupMatcher compatibility_score (availability, study_style, goal)",
+    'matching': "match record avg_compatibility (availability, study_preference, location_preference)",
+}
+
+
+def _run_matching(engine: str) -> EngineRun:
+    """Build a runner for matching.match_students with the given engine."""
+    def run(submissions, min_group_size, max_group_size):
+        by_id = {s['id']: s for s in submissions}
+        groups, unmatched = match_students(
+            submissions,
+            min_group_size=min_group_size,
+            max_group_size=max_group_size,
+            engine=engine
+        )
+        return (
+            [[by_id[sid] for sid in group['student_ids']] for group in groups],
+            len(unmatched),
+            [group['avg_compatibility'] for group in groups]
+        )
+    return run
+
+
+def _run_clustering() -> EngineRun:
+    """Build a runner for GroupMatcher.match_students, matching course by course."""
+    # Imported here so scikit-learn's import time stays out of the timed run
+    from backend.models.submission import Submission
+    from backend.src.aggregation.clustering import GroupMatcher
+    from backend.src.aggregation.scoring import CompatibilityScorer
+
+    def run(submissions, min_group_size, max_group_size):
+        matcher = GroupMatcher(CompatibilityScorer(), min_group_size, max_group_size)
+        by_pennkey = {s['pennkey']: s for s in submissions}
+
+        courses: Dict[str, List[Submission]] = {}
+        for s in submissions:
+            courses.setdefault(s['course'], []).append(Submission(
+                id=s['id'],
+                pennkey=s['pennkey'],
+                course=s['course'],
+                availability=s['availability'],
+                study_style=s['study_style'],
+                goal=s['goal'],
+                status='validated'
+            ))
+
+        groups = []
+        objectives = []
+        for course, course_submissions in courses.items():
+            for match in matcher.match_students(course_submissions, course):
+                groups.append([by_pennkey[member['pennkey']] for member in match['members']])
+                objectives.append(match['compatibility_score'])
+
+        matched = sum(len(group) for group in groups)
+        return groups, len(submissions) - matched, objectives
+    return run
+
+
+def get_engine(name: str) -> EngineRun:
+    """
+    Look up an engine runner by name.
+
+    Args:
+        name: 'clustering' or 'matching.<engine>' for any engine in MATCHING_ENGINES
+
+    Returns:
+        Runner callable
+    """
+    if name == 'clustering':
+        return _run_clustering()
+    if name.startswith('matching.') and name.split('.', 1)[1] in MATCHING_ENGINES:
+        return _run_matching(name.split('.', 1)[1])
+    raise ValueError(f"Unknown engine: {name}")
+
+
+def benchmark(engine: str, config: WorkloadConfig, min_group_size: int = 3,
+              max_group_size: int = 5, measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark one engine on one workload.
+
+    Wall time is measured without tracemalloc, which slows Python code down,
+    and peak memory in a separate traced run.
+
+    Args:
+        engine: Engine name (see get_engine)
+        config: Workload parameters
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        measure_memory: Whether to do the traced run for peak memory
+
+    Returns:
+        Result dictionary
+    """
+    run = get_engine(engine)
+    submissions = generate_submissions(config)
+
+    start = time.perf_counter()
+    groups, unmatched, objectives = run(submissions, min_group_size, max_group_size)
+    wall_time = time.perf_counter() - start
+
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        run(submissions, min_group_size, max_group_size)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # Score every engine's groups the same way so quality is comparable. This is
+    # the matching engines' objective, so clustering is also reported under its own
+    compatibilities = [compute_group_metrics(group)['avg_compatibility'] for group in groups]
+
+    return {
+        "engine": engine,
+        "students_per_course": config.students_per_course,
+        "courses": config.courses,
+        "total_students": len(submissions),
+        "wall_time_s": round(wall_time, 4),
+        "peak_memory_bytes": peak_memory,
+        "groups": len(groups),
+        "mean_avg_compatibility": round(statistics.mean(compatibilities), 4) if compatibilities else 0.0,
+        "mean_avg_compatibility_basis": ENGINE_OBJECTIVES['matching'],
+        "mean_engine_objective": round(statistics.mean(objectives), 4) if objectives else 0.0,
+        "engine_objective": ENGINE_OBJECTIVES[engine.split('.', 1)[0]],
+        "unmatched_rate": round(unmatched / len(submissions), 4) if submissions else 0.0
+    }
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    """Parse a weighted mix like 'PSets=0.5,Mixed=0.5'."""
+    mix = {}
+    for part in value.split(','):
+        key, weight = part.split('=')
+        mix[key.strip()] = float(weight)
+    return mix
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GroupMeet matching engines")
+    parser.add_argument('--engines', nargs='+', default=DEFAULT_ENGINES,
+                        help="clustering and/or matching.<engine> (%s)" % ', '.join(MATCHING_ENGINES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="students per course")
+    parser.add_argument('--courses', type=int, default=1)
+    parser.add_argument('--size-distribution', default='fixed', choices=['fixed', 'uniform', 'lognormal'])
+    parser.add_argument('--availability-density', type=float, default=0.2)
+    parser.add_argument('--preference-mix', type=_parse_mix, default=None,
+                        help="e.g. 'PSets=0.5,Exam Prep=0.5'")
+    parser.add_argument('--location-mix', type=_parse_mix, default=None,
+                        help="e.g. 'In-person=0.5,Virtual=0.5'")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-group-size', type=int, default=3)
+    parser.add_argument('--max-group-size', type=int, default=5)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc run")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        config = WorkloadConfig(
+            seed=args.seed,
+            courses=args.courses,
+            students_per_course=size,
+            size_distribution=args.size_distribution,
+            availability_density=args.availability_density
+        )
+        if args.preference_mix:
+            config.preference_mix = args.preference_mix
+        if args.location_mix:
+            config.location_mix = args.location_mix
+
+        for engine in args.engines:
+            print(f"Running {engine} on {args.courses} x {size} students...", file=sys.stderr)
+            result = benchmark(engine, config, args.min_group_size, args.max_group_size,
+                               measure_memory=not args.no_memory)
+            result["workload"] = config.to_dict()
+            results.append(result)
+
+    output = json.dumps({"results": results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
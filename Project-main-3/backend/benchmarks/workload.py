@@ -0,0 +1,100 @@
+"""
+Seeded synthetic submission generator for matching benchmarks.
+
+Generated submissions carry the fields used by both matching engines:
+availability, study_preference and location_preference for
+matching.match_students, and study_style and goal for GroupMatcher.
+"""
+import random
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List
+
+# Same grid as the availability calendar in the frontend
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+TIME_SLOTS = ['8am-10am', '10am-12pm', '12pm-2pm', '2pm-4pm', '4pm-6pm', '6pm-8pm']
+SLOTS = [f"{day} {time_slot}" for day in DAYS for time_slot in TIME_SLOTS]
+
+STUDY_STYLES = ['visual', 'textual', 'auditory', 'kinesthetic']
+GOALS = ['problem_sets', 'concept_review', 'exam_prep']
+
+
+@dataclass
+class WorkloadConfig:
+    """Parameters of a synthetic workload."""
+
+    seed: int = 0
+    courses: int = 1
+    students_per_course: int = 100
+    size_distribution: str = 'fixed'  # fixed, uniform, lognormal
+    availability_density: float = 0.2  # mean fraction of SLOTS each student marks
+    preference_mix: Dict[str, float] = field(default_factory=lambda: {
+        'PSets': 0.3, 'Concept Review': 0.2, 'Discussion': 0.15, 'Exam Prep': 0.25, 'Mixed': 0.1
+    })
+    location_mix: Dict[str, float] = field(default_factory=lambda: {
+        'In-person': 0.4, 'Virtual': 0.2, 'Either': 0.4
+    })
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON output."""
+        return asdict(self)
+
+
+def _course_sizes(config: WorkloadConfig, rng: random.Random) -> List[int]:
+    """Draw the number of students in each course."""
+    mean = config.students_per_course
+    if config.size_distribution == 'fixed':
+        return [mean] * config.courses
+    if config.size_distribution == 'uniform':
+        return [rng.randint(max(1, mean // 2), mean + mean // 2) for _ in range(config.courses)]
+    if config.size_distribution == 'lognormal':
+        # A few large intro courses and many small ones, with the requested mean
+        sigma = 1.0
+        return [max(1, int(rng.lognormvariate(0, sigma) * mean / 1.6487)) for _ in range(config.courses)]
+    raise ValueError(f"Unknown size distribution: {config.size_distribution}")
+
+
+def _choose(mix: Dict[str, float], rng: random.Random) -> str:
+    """Draw a value from a weighted mix."""
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+def generate_submissions(config: WorkloadConfig) -> List[Dict[str, Any]]:
+    """
+    Generate synthetic submissions.
+
+    The same config always produces the same submissions.
+
+    Args:
+        config: Workload parameters
+
+    Returns:
+        List of submission dictionaries, grouped by course
+    """
+    rng = random.Random(config.seed)
+    submissions = []
+    student_number = 0
+
+    for course_number, size in enumerate(_course_sizes(config, rng)):
+        course = f"BENCH{course_number:04d}"
+        for _ in range(size):
+            student_number += 1
+            slot_count = min(len(SLOTS), max(1, round(rng.gauss(
+                config.availability_density * len(SLOTS),
+                config.availability_density * len(SLOTS) / 3
+            ))))
+            pennkey = f"bench{student_number:06d}"
+            submissions.append({
+                'id': f"bench-{student_number:06d}",
+                'pennkey': pennkey,
+                'name': f"Student {student_number}",
+                'email': f"{pennkey}@upenn.edu",
+                'course': course,
+                'availability': rng.sample(SLOTS, slot_count),
+                'study_preference': _choose(config.preference_mix, rng),
+                'location_preference': _choose(config.location_mix, rng),
+                'study_style': rng.choice(STUDY_STYLES),
+                'goal': rng.choice(GOALS),
+                'commitment_confirmed': True
+            })
+
+    return submissions
@@ -0,0 +1,219 @@
+"""
+Vectorized pairwise compatibility for the matching algorithm.
+
+Builds the full n x n compatibility matrix for a course in one NumPy pass from
+encoded availability, study_preference and location_preference columns.
+Requires numpy.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from alignment import compute_location_alignment, compute_preference_alignment
+from availability import AvailabilityEncoder
+
+
+class CompatibilityMatrix:
+    """Pairwise component and combined compatibility scores for a course."""
+
+    def __init__(self, availability: np.ndarray, preference: np.ndarray,
+                 location: np.ndarray, scores: np.ndarray):
+        """
+        Args:
+            availability: n x n availability overlap (Jaccard) matrix
+            preference: n x n study preference alignment matrix
+            location: n x n location preference alignment matrix
+            scores: n x n weighted compatibility matrix
+        """
+        self.availability = availability
+        self.preference = preference
+        self.location = location
+        self.scores = scores
+
+    def __len__(self) -> int:
+        return self.scores.shape[0]
+
+
+def availability_bit_matrix(masks: List[int], n_slots: int) -> np.ndarray:
+    """
+    Expand availability bitmasks into an n x n_slots 0/1 matrix.
+
+    Args:
+        masks: Availability bitmasks from an AvailabilityEncoder
+        n_slots: Size of the encoder's slot vocabulary
+
+    Returns:
+        float64 matrix with a 1 for every slot a student is available
+    """
+    n_bytes = max(1, (n_slots + 7) // 8)
+    packed = np.frombuffer(
+        b''.join(mask.to_bytes(n_bytes, 'little') for mask in masks),
+        dtype=np.uint8
+    ).reshape(len(masks), n_bytes)
+    bits = np.unpackbits(packed, axis=1, bitorder='little')[:, :n_slots]
+    return bits.astype(np.float64)
+
+
+def availability_overlap_matrix(masks: List[int], n_slots: int) -> np.ndarray:
+    """
+    Compute pairwise Jaccard overlap for all students at once.
+
+    Matches compute_availability_overlap for every pair.
+
+    Args:
+        masks: Availability bitmasks from an AvailabilityEncoder
+        n_slots: Size of the encoder's slot vocabulary
+
+    Returns:
+        n x n overlap matrix
+    """
+    bits = availability_bit_matrix(masks, n_slots)
+    intersection = bits @ bits.T
+    sizes = bits.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+
+    overlap = np.zeros_like(intersection)
+    nonempty = (sizes[:, None] > 0) & (sizes[None, :] > 0)
+    np.divide(intersection, union, out=overlap, where=nonempty)
+    return overlap
+
+
+def alignment_matrix(values: List[Any], align: Callable[[Any, Any], float]) -> np.ndarray:
+    """
+    Compute a pairwise alignment matrix for a categorical column.
+
+    Distinct values are interned and the alignment function is evaluated once
+    per pair of distinct values, then broadcast to all student pairs.
+
+    Args:
+        values: Column value for each student
+        align: Pairwise alignment function (e.g. compute_location_alignment)
+
+    Returns:
+        n x n alignment matrix
+    """
+    codes: Dict[Any, int] = {}
+    column = np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.intp)
+    distinct = list(codes)
+    table = np.array(
+        [[align(a, b) for b in distinct] for a in distinct],
+        dtype=np.float64
+    ).reshape(len(distinct), len(distinct))
+    return table[column[:, None], column[None, :]]
+
+
+def build_compatibility_matrix(
+    students: List[Dict[str, Any]],
+    encoder: Optional[AvailabilityEncoder] = None,
+    availability_weight: float = 0.6,
+    preference_weight: float = 0.25,
+    location_weight: float = 0.15
+) -> CompatibilityMatrix:
+    """
+    Build the compatibility matrix for a course.
+
+    Entry [i, j] equals compute_compatibility_score(students[i], students[j]).
+
+    Args:
+        students: Submissions for one course
+        encoder: Availability encoder to intern slots with (default: new encoder)
+        availability_weight: Weight for availability overlap (default 0.6)
+        preference_weight: Weight for preference alignment (default 0.25)
+        location_weight: Weight for location preference alignment (default 0.15)
+
+    Returns:
+        CompatibilityMatrix with component and combined scores
+    """
+    if encoder is None:
+        encoder = AvailabilityEncoder()
+    masks = [encoder.encode(s.get('availability', [])) for s in students]
+
+    availability = availability_overlap_matrix(masks, len(encoder))
+    preference = alignment_matrix(
+        [s.get('study_preference', '') for s in students],
+        compute_preference_alignment
+    )
+    location = alignment_matrix(
+        [s.get('location_preference', 'Either') for s in students],
+        compute_location_alignment
+    )
+
+    scores = (availability_weight * availability) + \
+             (preference_weight * preference) + \
+             (location_weight * location)
+
+    return CompatibilityMatrix(availability, preference, location, scores)
+
+
+def compute_group_metrics_batch(
+    matrix: CompatibilityMatrix,
+    groups: List[List[int]],
+    availability_weight: float = 0.6,
+    preference_weight: float = 0.25,
+    location_weight: float = 0.15
+) -> List[Dict[str, Any]]:
+    """
+    Compute metrics for many groups at once from a course's component matrices.
+
+    Matrix-based counterpart of compute_group_metrics: pair scores are read
+    from the precomputed matrices instead of recomputed from the submission
+    dicts, and are summed in the same pair order so results are identical.
+
+    Args:
+        matrix: The course's CompatibilityMatrix
+        groups: Groups as index lists into the matrix
+        availability_weight: Weight for availability overlap (default 0.6)
+        preference_weight: Weight for preference alignment (default 0.25)
+        location_weight: Weight for location preference alignment (default 0.15)
+
+    Returns:
+        List of group metric dictionaries, one per group
+    """
+    if not groups:
+        return []
+
+    # Pair (i, j), i < j, of each group as rows/columns into the matrices,
+    # padded with pair (0, 0) and masked out of the sums
+    max_pairs = max(len(g) * (len(g) - 1) // 2 for g in groups)
+    rows = np.zeros((len(groups), max(1, max_pairs)), dtype=np.intp)
+    cols = np.zeros_like(rows)
+    valid = np.zeros(rows.shape, dtype=bool)
+    pair_counts = np.zeros(len(groups))
+    for g, members in enumerate(groups):
+        pairs = [(members[i], members[j]) for i in range(len(members)) for j in range(i + 1, len(members))]
+        if pairs:
+            rows[g, :len(pairs)], cols[g, :len(pairs)] = zip(*pairs)
+            valid[g, :len(pairs)] = True
+        pair_counts[g] = len(pairs)
+
+    def pair_average(component: np.ndarray) -> np.ndarray:
+        values = np.where(valid, component[rows, cols], 0.0)
+        # Accumulate pair by pair, matching compute_group_metrics' summation order
+        total = np.zeros(len(groups))
+        for k in range(values.shape[1]):
+            total = total + values[:, k]
+        return np.divide(total, pair_counts, out=np.zeros(len(groups)), where=pair_counts > 0)
+
+    availability = pair_average(matrix.availability)
+    preference = pair_average(matrix.preference)
+    location = pair_average(matrix.location)
+    compatibility = (availability_weight * availability) + \
+                    (preference_weight * preference) + \
+                    (location_weight * location)
+
+    metrics = []
+    for g, members in enumerate(groups):
+        if len(members) < 2:
+            metrics.append({
+                "availability_overlap": 0.0,
+                "preference_alignment": 0.0,
+                "avg_compatibility": 0.0
+            })
+            continue
+        metrics.append({
+            "availability_overlap": round(float(availability[g]), 3),
+            "preference_alignment": round(float(preference[g]), 3),
+            "location_alignment": round(float(location[g]), 3),
+            "avg_compatibility": round(float(compatibility[g]), 3)
+        })
+    return metrics
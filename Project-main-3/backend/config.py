@@ -2,6 +2,7 @@
 Configuration management for GroupMeet backend.
 """
 import os
+import json
 from typing import Dict, Any
 
 class Config:
@@ -17,6 +18,11 @@ class Config:
     # Google Sheets Configuration
     GOOGLE_SHEETS_ID = os.environ.get('GOOGLE_SHEETS_ID', '')
     GOOGLE_CREDENTIALS_PATH = os.environ.get('GOOGLE_CREDENTIALS_PATH', '')
+    SHEETS_CACHE_TTL = float(os.environ.get('SHEETS_CACHE_TTL', '30'))  # seconds, 0 disables
+    SHEETS_WRITE_BEHIND = os.environ.get('SHEETS_WRITE_BEHIND', 'False').lower() == 'true'
+    SHEETS_FLUSH_SIZE = int(os.environ.get('SHEETS_FLUSH_SIZE', '50'))
+    SHEETS_FLUSH_INTERVAL = float(os.environ.get('SHEETS_FLUSH_INTERVAL', '2'))  # seconds
+    SHEETS_MAX_PENDING = int(os.environ.get('SHEETS_MAX_PENDING', '1000'))
     
     # Email Configuration (for future use)
     EMAIL_PROVIDER = os.environ.get('EMAIL_PROVIDER', 'console')  # 'console', 'sendgrid', 'smtp'
@@ -26,8 +32,22 @@ class Config:
     # Matching Configuration
     MIN_GROUP_SIZE = int(os.environ.get('MIN_GROUP_SIZE', '3'))
     MAX_GROUP_SIZE = int(os.environ.get('MAX_GROUP_SIZE', '5'))
-    AVAILABILITY_WEIGHT = float(os.environ.get('AVAILABILITY_WEIGHT', '0.7'))
-    PREFERENCE_WEIGHT = float(os.environ.get('PREFERENCE_WEIGHT', '0.3'))
+    AVAILABILITY_WEIGHT = float(os.environ.get('AVAILABILITY_WEIGHT', '0.6'))
+    PREFERENCE_WEIGHT = float(os.environ.get('PREFERENCE_WEIGHT', '0.25'))
+    LOCATION_WEIGHT = float(os.environ.get('LOCATION_WEIGHT', '0.15'))
+    # Per-course overrides, e.g. {"CIS1200": {"availability": 0.8, "preference": 0.2}}
+    MATCHING_COURSE_WEIGHTS = json.loads(os.environ.get('MATCHING_COURSE_WEIGHTS', '{}'))
+    MATCHING_ENGINE = os.environ.get('MATCHING_ENGINE', 'greedy')  # 'greedy', 'matrix' (requires numpy) or 'indexed'
+    MATCHING_WORKERS = int(os.environ.get('MATCHING_WORKERS', '1'))  # >1 matches large courses in parallel processes
+    MATCHING_PARALLEL_MIN_COURSE_SIZE = int(os.environ.get('MATCHING_PARALLEL_MIN_COURSE_SIZE', '200'))
+    MATCHING_PARTITION_MIN_COURSE_SIZE = int(os.environ.get('MATCHING_PARTITION_MIN_COURSE_SIZE', '0'))  # 0 disables
+    MATCHING_MAX_BUCKET_SIZE = int(os.environ.get('MATCHING_MAX_BUCKET_SIZE', '500'))
+    MATCHING_REFINE_TIME_BUDGET = float(os.environ.get('MATCHING_REFINE_TIME_BUDGET', '0'))  # seconds per course, 0 disables
+    CLUSTERING_SPARSE_MIN_SIZE = int(os.environ.get('CLUSTERING_SPARSE_MIN_SIZE', '2000'))  # 0 disables
+    CLUSTERING_NEIGHBORS = int(os.environ.get('CLUSTERING_NEIGHBORS', '15'))
+    CLUSTERING_STORAGE = os.environ.get('CLUSTERING_STORAGE', 'dense')  # 'dense' or 'condensed' (float32 upper triangle)
+    CLUSTERING_MEASURE_MEMORY = os.environ.get('CLUSTERING_MEASURE_MEMORY', 'False').lower() == 'true'
+    MATCH_CACHE_MAX_BYTES = int(os.environ.get('MATCH_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))  # 0 disables
     
     # Application Configuration
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -2,14 +2,22 @@
 Database abstraction layer for GroupMeet.
 Supports Firebase Firestore and Google Sheets with easy swapping.
 """
+import atexit
 import json
+import signal
+import sys
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from abc import ABC, abstractmethod
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Maximum writes in one Firestore WriteBatch
+FIRESTORE_BATCH_LIMIT = 500
+
 
 class DatabaseInterface(ABC):
     """Abstract base class for database implementations."""
@@ -29,11 +37,30 @@ class DatabaseInterface(ABC):
         """Get all submissions."""
         pass
     
+    def get_submissions_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Get all submissions for a course."""
+        return [s for s in self.get_all_submissions() if s.get('course') == course]
+    
+    def get_submissions_by_pennkey(self, pennkey: str) -> List[Dict[str, Any]]:
+        """Get all submissions made by a user."""
+        return [s for s in self.get_all_submissions() if s.get('pennkey') == pennkey]
+    
+    def find_submission(self, pennkey: str, course: str) -> Optional[Dict[str, Any]]:
+        """Get a user's submission for a course, if any."""
+        for submission in self.get_submissions_by_pennkey(pennkey):
+            if submission.get('course') == course:
+                return submission
+        return None
+    
     @abstractmethod
     def save_match(self, match_data: Dict[str, Any]) -> str:
         """Save a match result and return its ID."""
         pass
     
+    def save_matches(self, matches: List[Dict[str, Any]]) -> List[str]:
+        """Save many match results and return their IDs in order."""
+        return [self.save_match(match_data) for match_data in matches]
+    
     @abstractmethod
     def get_match(self, match_id: str) -> Optional[Dict[str, Any]]:
         """Get a match by ID."""
@@ -43,6 +70,16 @@ class DatabaseInterface(ABC):
     def get_matches_by_student(self, student_id: str) -> List[Dict[str, Any]]:
         """Get all matches for a student."""
         pass
+    
+    @abstractmethod
+    def get_matches_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Get all matches for a course."""
+        pass
+    
+    @abstractmethod
+    def update_match(self, match_id: str, match_data: Dict[str, Any]) -> None:
+        """Update fields of an existing match."""
+        pass
 
 
 class FirestoreDB(DatabaseInterface):
@@ -90,6 +127,23 @@ class FirestoreDB(DatabaseInterface):
         docs = self.db.collection('submissions').stream()
         return [doc.to_dict() for doc in docs]
     
+    def get_submissions_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Get submissions for a course."""
+        docs = self.db.collection('submissions').where('course', '==', course).stream()
+        return [doc.to_dict() for doc in docs]
+    
+    def get_submissions_by_pennkey(self, pennkey: str) -> List[Dict[str, Any]]:
+        """Get submissions made by a user."""
+        docs = self.db.collection('submissions').where('pennkey', '==', pennkey).stream()
+        return [doc.to_dict() for doc in docs]
+    
+    def find_submission(self, pennkey: str, course: str) -> Optional[Dict[str, Any]]:
+        """Get a user's submission for a course, if any."""
+        query = self.db.collection('submissions').where('pennkey', '==', pennkey).where('course', '==', course)
+        for doc in query.limit(1).stream():
+            return doc.to_dict()
+        return None
+    
     def save_match(self, match_data: Dict[str, Any]) -> str:
         """Save match to Firestore."""
         from firebase_admin import firestore
@@ -99,6 +153,21 @@ class FirestoreDB(DatabaseInterface):
         self.db.collection('matches').document(match_id).set(match_data)
         return match_id
     
+    def save_matches(self, matches: List[Dict[str, Any]]) -> List[str]:
+        """Save matches to Firestore in WriteBatches of up to FIRESTORE_BATCH_LIMIT."""
+        from firebase_admin import firestore
+        match_ids = []
+        for start in range(0, len(matches), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for match_data in matches[start:start + FIRESTORE_BATCH_LIMIT]:
+                match_id = str(uuid.uuid4())
+                match_data['id'] = match_id
+                match_data['created_at'] = firestore.SERVER_TIMESTAMP
+                batch.set(self.db.collection('matches').document(match_id), match_data)
+                match_ids.append(match_id)
+            batch.commit()
+        return match_ids
+    
     def get_match(self, match_id: str) -> Optional[Dict[str, Any]]:
         """Get match from Firestore."""
         doc = self.db.collection('matches').document(match_id).get()
@@ -110,12 +179,105 @@ class FirestoreDB(DatabaseInterface):
         """Get matches for a student."""
         matches = self.db.collection('matches').where('student_ids', 'array_contains', student_id).stream()
         return [doc.to_dict() for doc in matches]
+    
+    def get_matches_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Get matches for a course."""
+        matches = self.db.collection('matches').where('course', '==', course).stream()
+        return [doc.to_dict() for doc in matches]
+    
+    def update_match(self, match_id: str, match_data: Dict[str, Any]) -> None:
+        """Update match in Firestore."""
+        match_data['id'] = match_id
+        self.db.collection('matches').document(match_id).set(match_data, merge=True)
+
+
+class _SheetSnapshot:
+    """Rows of a worksheet read at one point in time, with lookup indexes."""
+    
+    def __init__(self, records: List[Dict[str, Any]], keys: Dict[str, Callable[[Dict[str, Any]], Iterable[Any]]]):
+        """
+        Index a worksheet's records.
+        
+        Args:
+            records: Rows from get_all_records, in sheet order
+            keys: Index name -> function giving the values a row's data is indexed under
+        """
+        self.loaded_at = time.monotonic()
+        # Raw data JSON of each row; parsed again on every read so callers get their own copies
+        self.data: List[str] = []
+        self.by_id: Dict[Any, int] = {}
+        self.indexes: Dict[str, Dict[Any, List[int]]] = {name: {} for name in keys}
+        
+        for position, record in enumerate(records):
+            raw = record.get('data', '{}')
+            data = json.loads(raw)
+            self.data.append(raw)
+            self.by_id.setdefault(record.get('id'), position)
+            for name, key in keys.items():
+                for value in key(data):
+                    positions = self.indexes[name].setdefault(value, [])
+                    if not positions or positions[-1] != position:
+                        positions.append(position)
+    
+    def all(self) -> List[Dict[str, Any]]:
+        """Every row's data."""
+        return [json.loads(raw) for raw in self.data]
+    
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """Data of the first row with an ID."""
+        position = self.by_id.get(record_id)
+        return json.loads(self.data[position]) if position is not None else None
+    
+    def lookup(self, index: str, value: Any) -> List[Dict[str, Any]]:
+        """Data of the rows indexed under a value, in sheet order."""
+        return [json.loads(self.data[position]) for position in self.indexes[index].get(value, [])]
+    
+    def row_number(self, record_id: str) -> Optional[int]:
+        """Sheet row number of the first row with an ID."""
+        position = self.by_id.get(record_id)
+        return position + 2 if position is not None else None  # Row 1 is the header
 
 
 class SheetsDB(DatabaseInterface):
-    """Google Sheets implementation."""
+    """
+    Google Sheets implementation.
+    
+    Reads are served from a local snapshot of each worksheet, indexed by ID
+    (and by course, pennkey or student ID), which is reloaded once it is
+    older than cache_ttl seconds and dropped whenever this instance writes.
+    
+    With write_behind, submissions are buffered in memory and appended in
+    batches by a background thread; reads include buffered submissions.
+    """
     
-    def __init__(self, sheet_id: str, credentials_path: str):
+    # Submissions worksheet columns, as written by save_submission
+    SUBMISSION_COURSE_COLUMN = 'D'
+    SUBMISSION_DATA_COLUMN = 'G'
+    
+    # Values each worksheet's snapshot is indexed under
+    SUBMISSION_INDEXES = {
+        'course': lambda data: [data.get('course')],
+        'pennkey': lambda data: [data.get('pennkey')]
+    }
+    MATCH_INDEXES = {
+        'course': lambda data: [data.get('course')],
+        'student_id': lambda data: data.get('student_ids', [])
+    }
+    
+    def __init__(self, sheet_id: str, credentials_path: str, cache_ttl: float = 30.0,
+                 write_behind: bool = False, flush_size: int = 50, flush_interval: float = 2.0,
+                 max_pending: int = 1000, pending_timeout: float = 30.0):
+        """
+        Args:
+            sheet_id: Google Sheets spreadsheet ID
+            credentials_path: Path to the service account JSON
+            cache_ttl: Seconds a worksheet snapshot is reused for reads (0 disables caching)
+            write_behind: Buffer submissions and append them from a background thread
+            flush_size: Buffered submissions that trigger a flush
+            flush_interval: Seconds the oldest buffered submission waits before a flush
+            max_pending: Buffered submissions at which save_submission blocks
+            pending_timeout: Seconds save_submission blocks on a full buffer before failing
+        """
         try:
             import gspread
             from google.oauth2.service_account import Credentials
@@ -133,9 +295,44 @@ class SheetsDB(DatabaseInterface):
         except Exception as e:
             logger.warning(f"Sheets initialization failed: {e}")
             raise
+        
+        self.cache_ttl = cache_ttl
+        self._snapshots: Dict[str, Optional[_SheetSnapshot]] = {'submissions': None, 'matches': None}
+        # Bumped on every write, so a snapshot read before the write is not kept
+        self._generations: Dict[str, int] = {'submissions': 0, 'matches': 0}
+        self._snapshot_lock = threading.Lock()
+        
+        self.write_behind = write_behind
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending_timeout = pending_timeout
+        # Buffered (row, data JSON) pairs; _flushing holds the batch being appended
+        self._pending: List[Tuple[List[str], str]] = []
+        self._flushing: List[Tuple[List[str], str]] = []
+        self._pending_since: Optional[float] = None
+        self._pending_changed = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closing = False
+        self._flush_thread: Optional[threading.Thread] = None
+        if write_behind:
+            self._flush_thread = threading.Thread(
+                target=self._flush_loop, name='sheets-write-behind', daemon=True
+            )
+            self._flush_thread.start()
+            atexit.register(self.close)
+            self._flush_on_sigterm()
     
     def save_submission(self, data: Dict[str, Any]) -> str:
-        """Save submission to Sheets."""
+        """
+        Save submission to Sheets.
+        
+        With write_behind the row is buffered and the ID returned at once;
+        blocks while the buffer is full.
+        
+        Raises:
+            RuntimeError: If the buffer stays full for pending_timeout seconds
+        """
         submission_id = str(uuid.uuid4())
         data['id'] = submission_id
         row = [
@@ -147,60 +344,352 @@ class SheetsDB(DatabaseInterface):
             data.get('study_preference', ''),
             json.dumps(data)
         ]
+        
+        if self.write_behind and not self._closing:
+            self._buffer_submission(row)
+            return submission_id
+        
         self.submissions_sheet.append_row(row)
+        self._invalidate('submissions')
         return submission_id
     
     def get_submission(self, submission_id: str) -> Optional[Dict[str, Any]]:
         """Get submission from Sheets."""
-        records = self.submissions_sheet.get_all_records()
-        for record in records:
-            if record.get('id') == submission_id:
-                return json.loads(record.get('data', '{}'))
-        return None
+        for data in self._pending_submissions():
+            if data.get('id') == submission_id:
+                return data
+        return self._submissions().get(submission_id)
     
     def get_all_submissions(self) -> List[Dict[str, Any]]:
         """Get all submissions from Sheets."""
-        records = self.submissions_sheet.get_all_records()
-        return [json.loads(record.get('data', '{}')) for record in records]
+        return self._with_pending(self._submissions().all())
+    
+    def get_submissions_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """
+        Get submissions for a course.
+        
+        Served from the snapshot when caching is enabled; otherwise only the
+        course and data columns are read.
+        """
+        if self.cache_ttl > 0:
+            submissions = self._submissions().lookup('course', course)
+        else:
+            submissions = self._read_submissions_by_course(course)
+        return self._with_pending(submissions, lambda data: data.get('course') == course)
+    
+    def _read_submissions_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Read a course's submissions from the course and data columns."""
+        course_rows, data_rows = self.submissions_sheet.batch_get([
+            f'{self.SUBMISSION_COURSE_COLUMN}2:{self.SUBMISSION_COURSE_COLUMN}',
+            f'{self.SUBMISSION_DATA_COLUMN}2:{self.SUBMISSION_DATA_COLUMN}'
+        ])
+        submissions = []
+        for index, data_row in enumerate(data_rows):
+            # Trailing empty cells and rows are omitted from the response
+            row_course = course_rows[index][0] if index < len(course_rows) and course_rows[index] else ''
+            if data_row and row_course == course:
+                submissions.append(json.loads(data_row[0]))
+        return submissions
+    
+    def get_submissions_by_pennkey(self, pennkey: str) -> List[Dict[str, Any]]:
+        """
+        Get submissions made by a user.
+        
+        Served from the snapshot when caching is enabled; otherwise only the
+        data column is read.
+        """
+        if self.cache_ttl > 0:
+            submissions = self._submissions().lookup('pennkey', pennkey)
+        else:
+            submissions = self._read_submissions_by_pennkey(pennkey)
+        return self._with_pending(submissions, lambda data: data.get('pennkey') == pennkey)
+    
+    def _read_submissions_by_pennkey(self, pennkey: str) -> List[Dict[str, Any]]:
+        """Read a user's submissions from the data column."""
+        data_column = self.submissions_sheet.col_values(
+            ord(self.SUBMISSION_DATA_COLUMN) - ord('A') + 1
+        )[1:]  # Row 1 is the header
+        # The pennkey has no column of its own; only rows whose JSON mentions it are parsed
+        needle = json.dumps(pennkey)
+        submissions = []
+        for raw in data_column:
+            if needle in raw:
+                data = json.loads(raw)
+                if data.get('pennkey') == pennkey:
+                    submissions.append(data)
+        return submissions
     
     def save_match(self, match_data: Dict[str, Any]) -> str:
         """Save match to Sheets."""
         match_id = str(uuid.uuid4())
         match_data['id'] = match_id
-        row = [
-            match_id,
-            json.dumps(match_data.get('student_ids', [])),
-            json.dumps(match_data.get('group_members', [])),
-            json.dumps(match_data)
-        ]
-        self.matches_sheet.append_row(row)
+        self.matches_sheet.append_row(self._match_row(match_id, match_data))
+        self._invalidate('matches')
         return match_id
     
+    def save_matches(self, matches: List[Dict[str, Any]]) -> List[str]:
+        """Save matches to Sheets with a single append_rows call."""
+        match_ids = []
+        rows = []
+        for match_data in matches:
+            match_id = str(uuid.uuid4())
+            match_data['id'] = match_id
+            match_ids.append(match_id)
+            rows.append(self._match_row(match_id, match_data))
+        if rows:
+            self.matches_sheet.append_rows(rows)
+            self._invalidate('matches')
+        return match_ids
+    
     def get_match(self, match_id: str) -> Optional[Dict[str, Any]]:
         """Get match from Sheets."""
-        records = self.matches_sheet.get_all_records()
-        for record in records:
-            if record.get('id') == match_id:
-                return json.loads(record.get('data', '{}'))
-        return None
+        return self._matches().get(match_id)
     
     def get_matches_by_student(self, student_id: str) -> List[Dict[str, Any]]:
         """Get matches for a student."""
-        records = self.matches_sheet.get_all_records()
-        matches = []
-        for record in records:
-            student_ids = json.loads(record.get('student_ids', '[]'))
-            if student_id in student_ids:
-                matches.append(json.loads(record.get('data', '{}')))
-        return matches
+        return self._matches().lookup('student_id', student_id)
+    
+    def get_matches_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Get matches for a course."""
+        return self._matches().lookup('course', course)
+    
+    def update_match(self, match_id: str, match_data: Dict[str, Any]) -> None:
+        """Update match row in Sheets."""
+        # Row numbers are taken from a fresh read, never from a cached snapshot
+        snapshot = self._matches(refresh=True)
+        row_number = snapshot.row_number(match_id)
+        if row_number is None:
+            logger.warning(f"Match {match_id} not found in Sheets; nothing updated")
+            return
+        
+        data = snapshot.get(match_id)
+        data.update(match_data)
+        data['id'] = match_id
+        self.matches_sheet.batch_update([
+            {'range': f'A{row_number}:D{row_number}', 'values': [self._match_row(match_id, data)]}
+        ])
+        self._invalidate('matches')
+    
+    def flush(self) -> bool:
+        """
+        Append all buffered submissions in one append_rows call.
+        
+        Returns:
+            True if the buffer was written (or empty); on failure the rows stay buffered
+        """
+        with self._flush_lock:
+            with self._pending_changed:
+                if not self._pending:
+                    return True
+                batch = self._pending
+                self._flushing = batch
+                self._pending = []
+                self._pending_since = None
+            
+            try:
+                self.submissions_sheet.append_rows([row for row, _ in batch])
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} buffered submissions to Sheets: {e}")
+                with self._pending_changed:
+                    self._pending = batch + self._pending
+                    self._flushing = []
+                    self._pending_since = time.monotonic()
+                return False
+            
+            self._invalidate('submissions')
+            with self._pending_changed:
+                self._flushing = []
+                # Wake writers blocked on a full buffer
+                self._pending_changed.notify_all()
+            logger.info(f"Flushed {len(batch)} buffered submissions to Sheets")
+            return True
+    
+    def close(self) -> None:
+        """Stop the write-behind thread and flush what is still buffered."""
+        with self._pending_changed:
+            if self._closing:
+                return
+            self._closing = True
+            self._pending_changed.notify_all()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+        if not self.flush():
+            logger.error(f"{len(self._pending)} buffered submissions were not written to Sheets")
+    
+    def _flush_on_sigterm(self) -> None:
+        """
+        Flush the buffer when the process is sent SIGTERM.
+        
+        atexit alone misses the default SIGTERM action, which kills the
+        process without running exit handlers. A handler someone else
+        installed still runs afterwards; otherwise the process exits.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            logger.warning("SheetsDB created off the main thread; buffered submissions are not flushed on SIGTERM")
+            return
+        previous = signal.getsignal(signal.SIGTERM)
+        
+        def handle_sigterm(signum, frame):
+            self.close()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous != signal.SIG_IGN:
+                sys.exit(128 + signum)
+        
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    
+    def _buffer_submission(self, row: List[str]) -> None:
+        """Add a submission row to the write-behind buffer, waiting while it is full."""
+        deadline = time.monotonic() + self.pending_timeout
+        with self._pending_changed:
+            while len(self._pending) + len(self._flushing) >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError("Sheets write buffer is full; try again later")
+                self._pending_changed.notify_all()
+                self._pending_changed.wait(remaining)
+            
+            was_empty = not self._pending
+            if was_empty:
+                self._pending_since = time.monotonic()
+            self._pending.append((row, row[-1]))
+            # Wake the flush thread to start its timer, or to flush a full batch
+            if was_empty or len(self._pending) >= self.flush_size:
+                self._pending_changed.notify_all()
+    
+    def _flush_loop(self) -> None:
+        """Background thread: flush when the buffer is large or old enough."""
+        while True:
+            with self._pending_changed:
+                while not self._closing and not self._flush_due():
+                    self._pending_changed.wait(self._time_until_flush())
+                if self._closing:
+                    return
+            if not self.flush():
+                # Back off before retrying; close() still wakes the thread
+                with self._pending_changed:
+                    if not self._closing:
+                        self._pending_changed.wait(self.flush_interval)
+    
+    def _flush_due(self) -> bool:
+        """Whether the buffer should be flushed now (caller holds _pending_changed)."""
+        if not self._pending:
+            return False
+        return len(self._pending) >= self.flush_size or \
+            time.monotonic() - self._pending_since >= self.flush_interval
+    
+    def _time_until_flush(self) -> Optional[float]:
+        """Seconds until the oldest buffered row is due, None if the buffer is empty."""
+        if not self._pending:
+            return None
+        return max(0.0, self._pending_since + self.flush_interval - time.monotonic())
+    
+    def _pending_submissions(self) -> List[Dict[str, Any]]:
+        """Buffered submissions not yet confirmed written, oldest first."""
+        if not self.write_behind:
+            return []
+        with self._pending_changed:
+            buffered = self._flushing + self._pending
+        return [json.loads(raw) for _, raw in buffered]
+    
+    def _with_pending(self, submissions: List[Dict[str, Any]],
+                      predicate: Callable[[Dict[str, Any]], bool] = lambda data: True) -> List[Dict[str, Any]]:
+        """Append buffered submissions matching predicate that the sheet read did not include."""
+        pending = self._pending_submissions()
+        if not pending:
+            return submissions
+        seen = {submission.get('id') for submission in submissions}
+        return submissions + [data for data in pending if data.get('id') not in seen and predicate(data)]
+    
+    def invalidate_cache(self) -> None:
+        """Drop both snapshots, e.g. after the sheet was edited by hand."""
+        self._invalidate('submissions')
+        self._invalidate('matches')
+    
+    def _submissions(self, refresh: bool = False) -> _SheetSnapshot:
+        """Snapshot of the Submissions worksheet."""
+        return self._snapshot('submissions', self.submissions_sheet, self.SUBMISSION_INDEXES, refresh)
+    
+    def _matches(self, refresh: bool = False) -> _SheetSnapshot:
+        """Snapshot of the Matches worksheet."""
+        return self._snapshot('matches', self.matches_sheet, self.MATCH_INDEXES, refresh)
+    
+    def _snapshot(self, name: str, worksheet: Any,
+                  indexes: Dict[str, Callable[[Dict[str, Any]], Iterable[Any]]],
+                  refresh: bool) -> _SheetSnapshot:
+        """
+        Cached snapshot of a worksheet, reloaded when missing, stale or refresh is set.
+        
+        Args:
+            name: 'submissions' or 'matches'
+            worksheet: The worksheet to read
+            indexes: Values the snapshot is indexed under
+            refresh: Reload even if the cached snapshot is fresh
+            
+        Returns:
+            _SheetSnapshot of the worksheet
+        """
+        snapshot = self._snapshots[name]
+        if not refresh and self._is_fresh(snapshot):
+            return snapshot
+        
+        with self._snapshot_lock:
+            # Another request may have reloaded it while this one waited
+            snapshot = self._snapshots[name]
+            if not refresh and self._is_fresh(snapshot):
+                return snapshot
+            
+            generation = self._generations[name]
+            snapshot = _SheetSnapshot(worksheet.get_all_records(), indexes)
+            if self.cache_ttl > 0 and self._generations[name] == generation:
+                self._snapshots[name] = snapshot
+        return snapshot
+    
+    def _invalidate(self, name: str) -> None:
+        """Drop a worksheet's snapshot after writing to it."""
+        self._generations[name] += 1
+        self._snapshots[name] = None
+    
+    def _is_fresh(self, snapshot: Optional[_SheetSnapshot]) -> bool:
+        """Whether a snapshot can still serve reads."""
+        return snapshot is not None and time.monotonic() - snapshot.loaded_at < self.cache_ttl
+    
+    @staticmethod
+    def _match_row(match_id: str, match_data: Dict[str, Any]) -> List[str]:
+        """Matches worksheet row for a match."""
+        return [
+            match_id,
+            json.dumps(match_data.get('student_ids', [])),
+            json.dumps(match_data.get('group_members', [])),
+            json.dumps(match_data)
+        ]
 
 
 class InMemoryDB(DatabaseInterface):
-    """In-memory database for development/testing."""
+    """
+    In-memory database for development/testing.
+    
+    Secondary indexes by pennkey, course, (pennkey, course), student ID and
+    match course are maintained on every save, so filtered reads cost the
+    size of their result rather than of the whole collection.
+    """
     
     def __init__(self):
         self.submissions: Dict[str, Dict[str, Any]] = {}
         self.matches: Dict[str, Dict[str, Any]] = {}
+        
+        # Submission IDs by field value, in save order
+        self._submissions_by_pennkey: Dict[Any, List[str]] = {}
+        self._submissions_by_course: Dict[Any, List[str]] = {}
+        self._submissions_by_pennkey_course: Dict[Tuple[Any, Any], List[str]] = {}
+        
+        # Match IDs (as ordered sets) by student ID and course
+        self._matches_by_student: Dict[str, Dict[str, None]] = {}
+        self._matches_by_course: Dict[Any, Dict[str, None]] = {}
+        # (course, student_ids) each match is indexed under; matches can be
+        # changed in place by callers, so these are kept to unindex them
+        self._indexed_matches: Dict[str, Tuple[Any, Tuple[str, ...]]] = {}
+        
         logger.info("In-memory database initialized (development mode)")
     
     def save_submission(self, data: Dict[str, Any]) -> str:
@@ -208,6 +697,12 @@ class InMemoryDB(DatabaseInterface):
         submission_id = str(uuid.uuid4())
         data['id'] = submission_id
         self.submissions[submission_id] = data
+        
+        pennkey = data.get('pennkey')
+        course = data.get('course')
+        self._submissions_by_pennkey.setdefault(pennkey, []).append(submission_id)
+        self._submissions_by_course.setdefault(course, []).append(submission_id)
+        self._submissions_by_pennkey_course.setdefault((pennkey, course), []).append(submission_id)
         return submission_id
     
     def get_submission(self, submission_id: str) -> Optional[Dict[str, Any]]:
@@ -218,11 +713,25 @@ class InMemoryDB(DatabaseInterface):
         """Get all submissions from memory."""
         return list(self.submissions.values())
     
+    def get_submissions_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Get all submissions for a course from the course index."""
+        return [self.submissions[sid] for sid in self._submissions_by_course.get(course, [])]
+    
+    def get_submissions_by_pennkey(self, pennkey: str) -> List[Dict[str, Any]]:
+        """Get all submissions made by a user from the pennkey index."""
+        return [self.submissions[sid] for sid in self._submissions_by_pennkey.get(pennkey, [])]
+    
+    def find_submission(self, pennkey: str, course: str) -> Optional[Dict[str, Any]]:
+        """Get a user's submission for a course from the (pennkey, course) index."""
+        submission_ids = self._submissions_by_pennkey_course.get((pennkey, course))
+        return self.submissions[submission_ids[0]] if submission_ids else None
+    
     def save_match(self, match_data: Dict[str, Any]) -> str:
         """Save match to memory."""
         match_id = str(uuid.uuid4())
         match_data['id'] = match_id
         self.matches[match_id] = match_data
+        self._index_match(match_id)
         return match_id
     
     def get_match(self, match_id: str) -> Optional[Dict[str, Any]]:
@@ -230,11 +739,35 @@ class InMemoryDB(DatabaseInterface):
         return self.matches.get(match_id)
     
     def get_matches_by_student(self, student_id: str) -> List[Dict[str, Any]]:
-        """Get matches for a student."""
-        return [
-            match for match in self.matches.values()
-            if student_id in match.get('student_ids', [])
-        ]
+        """Get matches for a student from the student index."""
+        return [self.matches[mid] for mid in self._matches_by_student.get(student_id, {})]
+    
+    def get_matches_by_course(self, course: str) -> List[Dict[str, Any]]:
+        """Get matches for a course from the course index."""
+        return [self.matches[mid] for mid in self._matches_by_course.get(course, {})]
+    
+    def update_match(self, match_id: str, match_data: Dict[str, Any]) -> None:
+        """Update match in memory."""
+        match_data['id'] = match_id
+        self.matches.setdefault(match_id, {}).update(match_data)
+        self._index_match(match_id)
+    
+    def _index_match(self, match_id: str) -> None:
+        """Bring the match indexes up to date with a saved or updated match."""
+        match = self.matches[match_id]
+        course = match.get('course')
+        student_ids = tuple(match.get('student_ids', []))
+        
+        old_course, old_student_ids = self._indexed_matches.get(match_id, (None, ()))
+        if match_id in self._indexed_matches and old_course != course:
+            self._matches_by_course[old_course].pop(match_id, None)
+        for student_id in set(old_student_ids) - set(student_ids):
+            self._matches_by_student[student_id].pop(match_id, None)
+        
+        self._matches_by_course.setdefault(course, {})[match_id] = None
+        for student_id in student_ids:
+            self._matches_by_student.setdefault(student_id, {})[match_id] = None
+        self._indexed_matches[match_id] = (course, student_ids)
 
 
 def get_database(config) -> DatabaseInterface:
@@ -263,7 +796,12 @@ def get_database(config) -> DatabaseInterface:
         try:
             return SheetsDB(
                 config.GOOGLE_SHEETS_ID,
-                config.GOOGLE_CREDENTIALS_PATH
+                config.GOOGLE_CREDENTIALS_PATH,
+                cache_ttl=config.SHEETS_CACHE_TTL,
+                write_behind=config.SHEETS_WRITE_BEHIND,
+                flush_size=config.SHEETS_FLUSH_SIZE,
+                flush_interval=config.SHEETS_FLUSH_INTERVAL,
+                max_pending=config.SHEETS_MAX_PENDING
             )
         except Exception as e:
             logger.warning(f"Sheets init failed: {e}. Falling back to in-memory.")
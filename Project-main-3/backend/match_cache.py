@@ -0,0 +1,137 @@
+"""
+Content-addressed cache for matching results.
+
+A course's matching result depends only on its canonical matching inputs
+(submission ids, availability, preferences, group-size config and engine
+version), so those inputs are hashed into a key and the stored result is
+returned when nothing changed. Entries are evicted least-recently-used once
+the cache exceeds its memory cap.
+
+Used by both matching.match_students and GroupMatcher.match_students.
+"""
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default memory cap for cached results (bytes)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def make_cache_key(
+    namespace: str,
+    records: Iterable[Mapping[str, Any]],
+    fields: Sequence[str],
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Hash the canonical matching inputs of a course.
+
+    Records are hashed in order, since matching results depend on submission
+    order. A missing field hashes differently from a field set to None.
+
+    Args:
+        namespace: Engine name and version, e.g. "matching.greedy.v1"
+        records: Submission records for the course
+        fields: Record fields that affect the matching result
+        params: Engine configuration (group sizes, weights, ...)
+
+    Returns:
+        Hex digest identifying the inputs
+    """
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([namespace, params or {}], sort_keys=True, default=str).encode())
+    for record in records:
+        canonical = {field: record[field] for field in fields if field in record}
+        hasher.update(b'\n')
+        hasher.update(json.dumps(canonical, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+
+class MatchCache:
+    """Thread-safe LRU cache of matching results with a memory cap."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of cached results (0 disables caching)
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached result.
+
+        Results are stored serialized, so every call returns a fresh copy that
+        callers may mutate (e.g. db.save_match sets 'id').
+
+        Args:
+            key: Key from make_cache_key
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(payload)
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a result, evicting least-recently-used entries to fit the cap.
+
+        Args:
+            key: Key from make_cache_key
+            value: Picklable matching result
+        """
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            logger.info(f"Not caching matching result of {len(payload)} bytes (cap {self.max_bytes})")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = payload
+            self.current_bytes += len(payload)
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
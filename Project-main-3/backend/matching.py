@@ -2,11 +2,28 @@
 Matching algorithm for grouping students based on course, availability, and preferences.
 """
 import uuid
-from typing import Dict, List, Any, Tuple, Set
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from itertools import chain
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 import logging
 
+from alignment import compute_location_alignment, compute_preference_alignment
+from availability import AvailabilityEncoder, SlotIndex, rank_meeting_times, suggest_meeting_times
+from match_cache import MatchCache, make_cache_key
+from scorer import DEFAULT_WEIGHTS, MatchingWeights, WeightedScorer
+from partitioning import DEFAULT_MAX_BUCKET_SIZE, partition_course
+
 logger = logging.getLogger(__name__)
 
+# Bump when a change to the engines alters their output, to invalidate cached results
+MATCHING_ENGINE_VERSION = 3
+
+# Submission fields that affect a course's matching result
+MATCHING_INPUT_FIELDS = (
+    'id', 'name', 'email', 'availability', 'study_preference', 'location_preference'
+)
+
 
 def compute_availability_overlap(avail1: List[str], avail2: List[str]) -> float:
     """
@@ -34,56 +51,6 @@ def compute_availability_overlap(avail1: List[str], avail2: List[str]) -> float:
     return intersection / union
 
 
-def compute_preference_alignment(pref1: str, pref2: str) -> float:
-    """
-    Compute alignment score between two study preferences.
-    
-    Args:
-        pref1: Study preference for student 1
-        pref2: Study preference for student 2
-    
-    Returns:
-        Alignment score (1.0 if same, 0.0 if different)
-    """
-    if not pref1 or not pref2:
-        return 0.0
-    
-    return 1.0 if pref1.strip() == pref2.strip() else 0.0
-
-
-def compute_location_alignment(loc1: str, loc2: str) -> float:
-    """
-    Compute alignment score between two location preferences.
-    
-    Args:
-        loc1: Location preference for student 1 ("In-person", "Virtual", "Either")
-        loc2: Location preference for student 2
-    
-    Returns:
-        Alignment score:
-        - 1.0 if both are same and not "Either"
-        - 0.8 if one is "Either" and other is specific
-        - 0.5 if both are "Either"
-        - 0.0 if incompatible (In-person vs Virtual)
-    """
-    if not loc1 or not loc2:
-        return 0.0
-    
-    loc1 = loc1.strip()
-    loc2 = loc2.strip()
-    
-    if loc1 == loc2:
-        if loc1 == "Either":
-            return 0.5
-        return 1.0
-    
-    if loc1 == "Either" or loc2 == "Either":
-        return 0.8
-    
-    # Incompatible preferences
-    return 0.0
-
-
 def compute_compatibility_score(
     student1: Dict[str, Any],
     student2: Dict[str, Any],
@@ -122,12 +89,20 @@ def compute_compatibility_score(
     return score
 
 
-def compute_group_metrics(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+def compute_group_metrics(
+    group: List[Dict[str, Any]],
+    availability_weight: float = 0.6,
+    preference_weight: float = 0.25,
+    location_weight: float = 0.15
+) -> Dict[str, Any]:
     """
     Compute aggregate metrics for a group of students.
     
     Args:
         group: List of student dictionaries
+        availability_weight: Weight for availability overlap (default 0.6)
+        preference_weight: Weight for preference alignment (default 0.25)
+        location_weight: Weight for location preference alignment (default 0.15)
     
     Returns:
         Dictionary with group metrics
@@ -167,7 +142,9 @@ def compute_group_metrics(group: List[Dict[str, Any]]) -> Dict[str, Any]:
     avg_availability_overlap = sum(availability_overlaps) / len(availability_overlaps) if availability_overlaps else 0.0
     avg_preference_alignment = sum(preference_alignments) / len(preference_alignments) if preference_alignments else 0.0
     avg_location_alignment = sum(location_alignments) / len(location_alignments) if location_alignments else 0.0
-    avg_compatibility = (0.6 * avg_availability_overlap) + (0.25 * avg_preference_alignment) + (0.15 * avg_location_alignment)
+    avg_compatibility = (availability_weight * avg_availability_overlap) + \
+                        (preference_weight * avg_preference_alignment) + \
+                        (location_weight * avg_location_alignment)
     
     return {
         "availability_overlap": round(avg_availability_overlap, 3),
@@ -177,24 +154,742 @@ def compute_group_metrics(group: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
-def match_students(
-    submissions: List[Dict[str, Any]],
-    min_group_size: int = 3,
-    max_group_size: int = 5
-) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+def _build_match_record(
+    course: str,
+    group: List[Dict[str, Any]],
+    metrics: Optional[Dict[str, Any]] = None,
+    weights: MatchingWeights = DEFAULT_WEIGHTS,
+    meeting_times: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
-    Match students into groups using a greedy algorithm.
+    Build the match record stored for a formed group.
     
     Args:
-        submissions: List of student submission dictionaries
-        min_group_size: Minimum group size (default 3)
-        max_group_size: Maximum group size (default 5)
+        course: Course the group was formed for
+        group: List of student dictionaries in the group
+        metrics: Precomputed group metrics (computed from the dicts if not given)
+        weights: Score term weights for computing metrics
+        meeting_times: Precomputed ranked meeting times (computed from the dicts if not given)
     
     Returns:
-        Tuple of (matched_groups, unmatched_students)
+        Match record dictionary
+    """
+    if metrics is None:
+        metrics = compute_group_metrics(group, weights.availability, weights.preference, weights.location)
+    if meeting_times is None:
+        meeting_times = suggest_meeting_times([s.get('availability', []) for s in group])
+    
+    return {
+        "id": str(uuid.uuid4()),
+        "course": course,
+        "student_ids": [s.get('id') for s in group],
+        "group_members": [
+            {
+                "id": s.get('id'),
+                "name": s.get('name'),
+                "email": s.get('email'),
+                "study_preference": s.get('study_preference'),
+                "location_preference": s.get('location_preference', 'Either')
+            }
+            for s in group
+        ],
+        "group_size": len(group),
+        "availability_overlap": metrics["availability_overlap"],
+        "preference_alignment": metrics["preference_alignment"],
+        "location_alignment": metrics.get("location_alignment", 0.0),
+        "avg_compatibility": metrics["avg_compatibility"],
+        "suggested_meeting_time": meeting_times[0] if meeting_times else '',
+        "suggested_meeting_times": meeting_times
+    }
+
+
+# Admission threshold for adding a candidate to a growing group
+MIN_GROUP_COMPATIBILITY = 0.3
+
+# Slack on upper bounds so floating-point rounding never prunes a real candidate
+PRUNE_TOLERANCE = 1e-9
+
+
+def _form_groups_greedy(
+    students: List[Dict[str, Any]],
+    min_group_size: int,
+    max_group_size: int,
+    stats: Optional[Dict[str, Any]] = None,
+    scorer: Optional[WeightedScorer] = None
+) -> Tuple[List[List[int]], List[int]]:
+    """
+    Greedily form groups for a single course, scoring pairs on demand.
+    
+    Candidates are pruned branch-and-bound style: each gets a cheap upper
+    bound on its average score against the group (availability bounded by set
+    sizes plus the preference and location terms of its class), and is
+    only scored when that bound could reach MIN_GROUP_COMPATIBILITY and beat the
+    best candidate so far. Pruned candidates' scores are caught up later if
+    they are ever evaluated, so results are identical to scoring everyone.
+    
+    Args:
+        students: Submissions for this course
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        stats: Optional dict that receives "evaluations" and "pruned" counts
+        scorer: The course's WeightedScorer (compiled with default weights if not given)
+    
+    Returns:
+        Tuple of (groups, unmatched) as indices into students, in formation order
+    """
+    groups: List[List[int]] = []
+    unmatched: List[int] = []
+    
+    if scorer is None:
+        scorer = WeightedScorer(students)
+    records = scorer.records
+    availability_weight = scorer.weights.availability
+    evaluations = 0
+    pruned = 0
+    
+    # Remaining students keyed by index into the course list. Dict order is
+    # course order, so iteration matches the original list scan and removal is O(1).
+    # Note: Students can be in multiple groups (one per course), so we don't track "used"
+    remaining: Dict[int, None] = dict.fromkeys(range(len(students)))
+    next_seed = 0
+    
+    # Greedy matching: repeatedly form best groups
+    while len(remaining) >= min_group_size:
+        # Start with the first unmatched student
+        while next_seed not in remaining:
+            next_seed += 1
+        del remaining[next_seed]
+        group_indices = [next_seed]
+        group_ids = {records[next_seed].id_code}
+        
+        # Running sum of each candidate's scores against the first scored_upto[c]
+        # members, plus the sum of upper bounds against the members not yet scored
+        score_sums = [0.0] * len(students)
+        scored_upto = [0] * len(students)
+        pending_bounds = [0.0] * len(students)
+        
+        # Try to add compatible students
+        while len(group_indices) < max_group_size and remaining:
+            newest = records[group_indices[-1]]
+            newest_size = newest.size
+            newest_preference_terms = scorer.preference_terms[newest.preference_code]
+            newest_location_terms = scorer.location_terms[newest.location_code]
+            group_size = len(group_indices)
+            best_score = -1
+            best_candidate_index = -1
+            
+            # Candidates whose bounded score sum is below this cannot reach the
+            # threshold or beat the best candidate so far
+            cutoff_sum = MIN_GROUP_COMPATIBILITY * group_size - PRUNE_TOLERANCE
+            
+            # Find the most compatible remaining student
+            for candidate_index in remaining:
+                # Inlined WeightedScorer.upper_bound
+                candidate = records[candidate_index]
+                candidate_size = candidate.size
+                pending = pending_bounds[candidate_index] + \
+                    newest_preference_terms[candidate.preference_code] + \
+                    newest_location_terms[candidate.location_code]
+                if newest_size and candidate_size:
+                    pending += (availability_weight * newest_size / candidate_size if newest_size < candidate_size
+                                else availability_weight * candidate_size / newest_size)
+                
+                if score_sums[candidate_index] + pending < cutoff_sum:
+                    pending_bounds[candidate_index] = pending
+                    pruned += 1
+                    continue
+                
+                if candidate.id_code in group_ids:
+                    continue
+                
+                # Catch up on members added since this candidate was last scored,
+                # in group order so the sum is the same as scoring every step
+                score_sum = score_sums[candidate_index]
+                for member in group_indices[scored_upto[candidate_index]:]:
+                    score_sum += scorer.score(member, candidate_index)
+                    evaluations += 1
+                score_sums[candidate_index] = score_sum
+                scored_upto[candidate_index] = group_size
+                pending_bounds[candidate_index] = 0.0
+                
+                # Average compatibility with current group
+                avg_score = score_sum / group_size
+                
+                if avg_score > best_score:
+                    best_score = avg_score
+                    best_candidate_index = candidate_index
+                    if best_score > MIN_GROUP_COMPATIBILITY:
+                        cutoff_sum = best_score * group_size - PRUNE_TOLERANCE
+            
+            # Add candidate if compatibility is reasonable (threshold: MIN_GROUP_COMPATIBILITY)
+            if best_candidate_index >= 0 and best_score >= MIN_GROUP_COMPATIBILITY:
+                del remaining[best_candidate_index]
+                group_indices.append(best_candidate_index)
+                group_ids.add(records[best_candidate_index].id_code)
+            else:
+                # No good candidates, stop growing this group
+                break
+        
+        # If group meets minimum size, save it
+        if len(group_indices) >= min_group_size:
+            groups.append(group_indices)
+        else:
+            # Group too small, add back to unmatched
+            unmatched.extend(group_indices)
+    
+    # Add remaining unmatched students
+    unmatched.extend(remaining)
+    
+    if stats is not None:
+        stats["evaluations"] = evaluations
+        stats["pruned"] = pruned
+    
+    return groups, unmatched
+
+
+def _build_course_matrix(students: List[Dict[str, Any]], weights: MatchingWeights = DEFAULT_WEIGHTS):
+    """
+    Build a course's CompatibilityMatrix, importing numpy lazily.
+    
+    Args:
+        students: Submissions for this course
+        weights: Score term weights
+    
+    Returns:
+        CompatibilityMatrix for the course
+    """
+    try:
+        from compatibility_matrix import build_compatibility_matrix
+    except ImportError:
+        raise ImportError("numpy not installed. Run: pip3 install numpy")
+    
+    return build_compatibility_matrix(
+        students,
+        availability_weight=weights.availability,
+        preference_weight=weights.preference,
+        location_weight=weights.location
+    )
+
+
+def _form_groups_matrix(
+    students: List[Dict[str, Any]],
+    min_group_size: int,
+    max_group_size: int,
+    matrix=None
+) -> Tuple[List[List[int]], List[int]]:
+    """
+    Greedily form groups for a single course from a precomputed score matrix.
+    
+    Uses the full n x n compatibility matrix and keeps a running sum of matrix
+    rows for the current group, so each growth step is a single vectorized
+    pass. Produces the same groups as _form_groups_greedy.
+    
+    Args:
+        students: Submissions for this course
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        matrix: The course's CompatibilityMatrix (built if not given)
+    
+    Returns:
+        Tuple of (groups, unmatched) as indices into students, in formation order
+    """
+    if matrix is None:
+        matrix = _build_course_matrix(students)
+    import numpy as np
+    
+    groups: List[List[int]] = []
+    unmatched: List[int] = []
+    
+    n = len(students)
+    scores = matrix.scores
+    
+    # Intern ids so duplicate-id exclusion is a vectorized comparison
+    id_codes: Dict[Any, int] = {}
+    ids = np.array([id_codes.setdefault(s.get('id'), len(id_codes)) for s in students])
+    
+    remaining = np.ones(n, dtype=bool)
+    remaining_count = n
+    next_seed = 0
+    
+    while remaining_count >= min_group_size:
+        while not remaining[next_seed]:
+            next_seed += 1
+        remaining[next_seed] = False
+        remaining_count -= 1
+        group_indices = [next_seed]
+        
+        # Running sum of every student's scores against the current group
+        score_sums = scores[next_seed].copy()
+        eligible = remaining & (ids != ids[next_seed])
+        
+        while len(group_indices) < max_group_size and remaining_count:
+            avg_scores = np.where(eligible, score_sums / len(group_indices), -1.0)
+            
+            # argmax returns the first best candidate, matching the greedy tie-break
+            best_candidate_index = int(np.argmax(avg_scores))
+            
+            # Add candidate if compatibility is reasonable (threshold: MIN_GROUP_COMPATIBILITY)
+            if avg_scores[best_candidate_index] >= MIN_GROUP_COMPATIBILITY:
+                remaining[best_candidate_index] = False
+                remaining_count -= 1
+                group_indices.append(best_candidate_index)
+                score_sums += scores[best_candidate_index]
+                eligible &= remaining & (ids != ids[best_candidate_index])
+            else:
+                break
+        
+        if len(group_indices) >= min_group_size:
+            groups.append(group_indices)
+        else:
+            unmatched.extend(group_indices)
+    
+    unmatched.extend(int(i) for i in np.flatnonzero(remaining))
+    
+    return groups, unmatched
+
+
+def _form_groups_indexed(
+    students: List[Dict[str, Any]],
+    min_group_size: int,
+    max_group_size: int,
+    scorer: Optional[WeightedScorer] = None
+) -> Tuple[List[List[int]], List[int]]:
+    """
+    Greedily form groups for a single course, scoring only overlapping pairs.
+    
+    Candidates sharing at least one availability slot with the group are
+    found through a SlotIndex and scored individually. Every other candidate
+    has zero availability overlap, so its score depends only on its
+    (study_preference, location_preference) pair; those are scored once per
+    distinct pair and only considered when they could clear
+    MIN_GROUP_COMPATIBILITY. Produces the same groups as _form_groups_greedy,
+    with cost scaling with overlap density rather than n^2.
+    
+    Args:
+        students: Submissions for this course
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        scorer: The course's WeightedScorer (compiled with default weights if not given)
+    
+    Returns:
+        Tuple of (groups, unmatched) as indices into students, in formation order
+    """
+    groups: List[List[int]] = []
+    unmatched: List[int] = []
+    
+    if scorer is None:
+        scorer = WeightedScorer(students)
+    records = scorer.records
+    masks = [record.mask for record in records]
+    index = SlotIndex(masks)
+    ids = [record.id_code for record in records]
+    
+    # Students with the same preference and location codes score identically
+    # against a group they share no slots with; each class is scored once
+    class_codes: Dict[Tuple[int, int], int] = {}
+    class_students: List[List[int]] = []
+    for student_index, record in enumerate(records):
+        key = (record.preference_code, record.location_code)
+        if key not in class_codes:
+            class_codes[key] = len(class_students)
+            class_students.append([])
+        class_students[class_codes[key]].append(student_index)
+    classes = list(class_codes)
+    class_cursors = [0] * len(class_students)
+    
+    remaining: Dict[int, None] = dict.fromkeys(range(len(students)))
+    next_seed = 0
+    
+    while len(remaining) >= min_group_size:
+        while next_seed not in remaining:
+            next_seed += 1
+        del remaining[next_seed]
+        group_indices = [next_seed]
+        group_ids = {ids[next_seed]}
+        
+        # Exact running score sums for candidates overlapping any member, and
+        # per-class running sums for candidates overlapping none
+        score_sums: Dict[int, float] = {}
+        class_sums = [0.0] * len(class_students)
+        
+        while len(group_indices) < max_group_size and remaining:
+            newest_member = group_indices[-1]
+            newest_mask = masks[newest_member]
+            
+            for candidate_index, score in zip(score_sums, scorer.scores(newest_member, list(score_sums))):
+                score_sums[candidate_index] += score
+            
+            # Candidates overlapping the group for the first time are scored
+            # against every member so far, in group order
+            for candidate_index in index.overlapping(newest_mask):
+                if candidate_index in score_sums or candidate_index not in remaining:
+                    continue
+                score_sum = 0.0
+                for member_index in group_indices:
+                    score_sum += scorer.score(member_index, candidate_index)
+                score_sums[candidate_index] = score_sum
+            
+            for class_code, (preference_code, location_code) in enumerate(classes):
+                class_sums[class_code] += scorer.disjoint_score(newest_member, preference_code, location_code)
+            
+            best_score = -1
+            best_candidate_index = -1
+            
+            # Ties go to the lowest index, matching the in-order greedy scan
+            for candidate_index, score_sum in score_sums.items():
+                if ids[candidate_index] in group_ids:
+                    continue
+                avg_score = score_sum / len(group_indices)
+                if avg_score > best_score or (avg_score == best_score and candidate_index < best_candidate_index):
+                    best_score = avg_score
+                    best_candidate_index = candidate_index
+            
+            # Fallback sweep: non-overlapping candidates only matter if their
+            # preference/location score alone can clear the threshold
+            for class_code, members in enumerate(class_students):
+                avg_score = class_sums[class_code] / len(group_indices)
+                if avg_score < MIN_GROUP_COMPATIBILITY or avg_score < best_score:
+                    continue
+                
+                cursor = class_cursors[class_code]
+                while cursor < len(members) and members[cursor] not in remaining:
+                    cursor += 1
+                class_cursors[class_code] = cursor
+                
+                for candidate_index in members[cursor:]:
+                    if avg_score == best_score and candidate_index > best_candidate_index:
+                        break
+                    if (candidate_index in remaining and candidate_index not in score_sums
+                            and ids[candidate_index] not in group_ids):
+                        best_score = avg_score
+                        best_candidate_index = candidate_index
+                        break
+            
+            # Add candidate if compatibility is reasonable (threshold: MIN_GROUP_COMPATIBILITY)
+            if best_candidate_index >= 0 and best_score >= MIN_GROUP_COMPATIBILITY:
+                del remaining[best_candidate_index]
+                score_sums.pop(best_candidate_index, None)
+                group_indices.append(best_candidate_index)
+                group_ids.add(ids[best_candidate_index])
+            else:
+                break
+        
+        if len(group_indices) >= min_group_size:
+            groups.append(group_indices)
+        else:
+            unmatched.extend(group_indices)
+    
+    unmatched.extend(remaining)
+    
+    return groups, unmatched
+
+
+# Per-course matching engines selectable via match_students(engine=...)
+MATCHING_ENGINES = {
+    'greedy': _form_groups_greedy,
+    'matrix': _form_groups_matrix,
+    'indexed': _form_groups_indexed,
+}
+
+# Engines that take the course's CompatibilityMatrix
+MATRIX_ENGINES = {'matrix'}
+
+# Engines that report upper-bound pruning counts
+PRUNING_ENGINES = {'greedy'}
+
+
+# Courses smaller than this are matched inline rather than in a worker process
+PARALLEL_MIN_COURSE_SIZE = 200
+
+
+def _match_course(
+    engine: str,
+    course: str,
+    students: List[Dict[str, Any]],
+    min_group_size: int,
+    max_group_size: int,
+    refine_time_budget: float = 0.0,
+    weights: MatchingWeights = DEFAULT_WEIGHTS,
+    course_weights: Optional[Dict[str, MatchingWeights]] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Match a single course and build its match records.
+    
+    The course's scorer is compiled once from its weights and used for both
+    group selection and group metrics. When the course has a
+    CompatibilityMatrix (matrix engine or refinement), it is built once and
+    reused for selection, refinement and group metrics instead.
+    
+    Args:
+        engine: Per-course engine name from MATCHING_ENGINES
+        course: Course identifier
+        students: Submissions for this course
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        refine_time_budget: Seconds of local-search refinement (0 disables)
+        weights: Score term weights
+        course_weights: Per-course weights overriding weights
+    
+    Returns:
+        Tuple of (matched_groups, unmatched_students, course_stats)
+    """
+    course_stats: Dict[str, Any] = {"students": len(students)}
+    form_groups = MATCHING_ENGINES[engine]
+    if course_weights and course in course_weights:
+        weights = course_weights[course]
+    
+    matrix = None
+    scorer = None
+    if engine in MATRIX_ENGINES or refine_time_budget > 0:
+        matrix = _build_course_matrix(students, weights)
+    if engine not in MATRIX_ENGINES:
+        scorer = WeightedScorer(students, weights)
+    
+    if engine in MATRIX_ENGINES:
+        groups, unmatched = form_groups(students, min_group_size, max_group_size, matrix=matrix)
+    elif engine in PRUNING_ENGINES:
+        course_stats["pruning"] = {}
+        groups, unmatched = form_groups(
+            students, min_group_size, max_group_size, stats=course_stats["pruning"], scorer=scorer
+        )
+    else:
+        groups, unmatched = form_groups(students, min_group_size, max_group_size, scorer=scorer)
+    
+    if refine_time_budget > 0 and len(groups) > 1:
+        from refinement import refine_course_groups
+        
+        groups, refinement_stats = refine_course_groups(
+            students, groups, matrix.scores, min_group_size, max_group_size, refine_time_budget
+        )
+        course_stats["refinement"] = refinement_stats
+        # Skipped refinements (e.g. duplicate ids) report no objective
+        if "objective_before" in refinement_stats:
+            logger.info(
+                f"Refined {course}: objective {refinement_stats['objective_before']:.3f} "
+                f"-> {refinement_stats['objective_after']:.3f}"
+            )
+    
+    # Meeting times are ranked from the course's masks rather than re-encoding
+    # each group; tied slots go to the one first seen in the course
+    if scorer is not None:
+        encoder = scorer.student_records.encoder
+        masks = [record.mask for record in scorer.records]
+    else:
+        encoder = AvailabilityEncoder()
+        masks = [encoder.encode(s.get('availability', [])) for s in students]
+    
+    # Metrics for all groups in one batched pass when the matrix is available
+    if matrix is not None:
+        from compatibility_matrix import compute_group_metrics_batch
+        group_metrics = compute_group_metrics_batch(
+            matrix, groups, weights.availability, weights.preference, weights.location
+        )
+    else:
+        group_metrics = [scorer.group_metrics(group) for group in groups]
+    
+    matched_groups = []
+    for group_indices, metrics in zip(groups, group_metrics):
+        matched_groups.append(
+            _build_match_record(
+                course, [students[i] for i in group_indices], metrics,
+                meeting_times=rank_meeting_times(encoder, [masks[i] for i in group_indices])
+            )
+        )
+        logger.info(f"Created group of {len(group_indices)} students for {course}")
+    
+    course_stats["groups"] = len(matched_groups)
+    course_stats["unmatched"] = len(unmatched)
+    
+    return matched_groups, [students[i] for i in unmatched], course_stats
+
+
+def _iter_match_courses(
+    jobs: Dict[Any, Tuple[str, List[Dict[str, Any]]]],
+    match_course,
+    min_group_size: int,
+    max_group_size: int,
+    workers: int,
+    parallel_min_course_size: int
+) -> Iterator[Tuple[Any, Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]]]:
+    """
+    Run a per-course matcher over every job, in parallel where worthwhile.
+    
+    A job is a course, or one bucket of a partitioned course. Jobs are
+    independent, so jobs with at least parallel_min_course_size students are
+    distributed across a process pool while smaller jobs are matched inline
+    in the meantime. Results are yielded as jobs finish.
+    
+    Args:
+        jobs: Job key -> (course, students)
+        match_course: Picklable callable (course, students, min, max) -> course result
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        workers: Maximum number of worker processes (1 = sequential)
+        parallel_min_course_size: Minimum job size to send to a worker
+    
+    Yields:
+        (job key, (matched_groups, unmatched_students, course_stats)) in completion order
+    """
+    parallel_jobs = []
+    if workers > 1:
+        parallel_jobs = [
+            key for key, (_, students) in jobs.items()
+            if len(students) >= parallel_min_course_size
+        ]
+    
+    # A single large job gains nothing from a pool
+    if len(parallel_jobs) < 2:
+        parallel_jobs = []
+    
+    if not parallel_jobs:
+        for key, (course, students) in jobs.items():
+            logger.info(f"Matching {len(students)} students for course {course}")
+            yield key, match_course(course, students, min_group_size, max_group_size)
+        return
+    
+    # Submit the largest jobs first so the slowest one starts immediately
+    parallel_jobs.sort(key=lambda key: len(jobs[key][1]), reverse=True)
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(parallel_jobs))) as executor:
+        futures = {}
+        for key in parallel_jobs:
+            course, students = jobs[key]
+            logger.info(f"Matching {len(students)} students for course {course} in worker")
+            future = executor.submit(match_course, course, students, min_group_size, max_group_size)
+            futures[future] = key
+        
+        in_pool = set(parallel_jobs)
+        for key, (course, students) in jobs.items():
+            if key not in in_pool:
+                logger.info(f"Matching {len(students)} students for course {course}")
+                yield key, match_course(course, students, min_group_size, max_group_size)
+        
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+class _PartitionedCourse:
+    """Bucket results of a partitioned course, collected until the leftover pass."""
+    
+    def __init__(self, students: List[Dict[str, Any]], buckets: List[List[int]]):
+        self.bucket_sizes = [len(bucket) for bucket in buckets]
+        self.students = len(students)
+        self.results: Dict[int, Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]] = {}
+        self.next_bucket = 0
+        self.leftovers: List[Dict[str, Any]] = []
+        self.bucket_stats: List[Dict[str, Any]] = []
+    
+    def add(self, bucket: int, result) -> List[Dict[str, Any]]:
+        """
+        Record a finished bucket.
+        
+        Buckets are released in bucket order so output does not depend on
+        worker timing.
+        
+        Returns:
+            Groups of the buckets released by this result
+        """
+        self.results[bucket] = result
+        released = []
+        while self.next_bucket in self.results:
+            matched, unmatched, stats = self.results.pop(self.next_bucket)
+            released.extend(matched)
+            self.leftovers.extend(unmatched)
+            self.bucket_stats.append(stats)
+            self.next_bucket += 1
+        return released
+    
+    def done(self) -> bool:
+        return self.next_bucket == len(self.bucket_sizes)
+
+
+def _match_leftovers(
+    engine: str,
+    course: str,
+    partition: _PartitionedCourse,
+    min_group_size: int,
+    max_group_size: int,
+    max_bucket_size: int,
+    refine_time_budget: float,
+    weights: MatchingWeights,
+    course_weights: Optional[Dict[str, MatchingWeights]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Cross-bucket pass over a partitioned course's leftover students.
+    
+    Leftovers that don't fit one bucket are matched with the indexed engine
+    and without refinement, so memory stays bounded by the bucket size.
+    
+    Returns:
+        Tuple of (matched_groups, unmatched_students, course_stats)
+    """
+    leftovers = partition.leftovers
+    if len(leftovers) > max_bucket_size:
+        engine = 'indexed'
+        refine_time_budget = 0.0
+    
+    matched, unmatched, leftover_stats = _match_course(
+        engine, course, leftovers, min_group_size, max_group_size,
+        refine_time_budget=refine_time_budget, weights=weights, course_weights=course_weights
+    )
+    logger.info(f"Leftover pass for {course}: {len(matched)} groups from {len(leftovers)} students")
+    
+    course_stats = {
+        "students": partition.students,
+        "partition": {
+            "buckets": partition.bucket_sizes,
+            "bucket_stats": partition.bucket_stats,
+            "leftover_pass": leftover_stats
+        },
+        "groups": sum(stats["groups"] for stats in partition.bucket_stats) + len(matched),
+        "unmatched": len(unmatched)
+    }
+    return matched, unmatched, course_stats
+
+
+def iter_match_students(
+    submissions: List[Dict[str, Any]],
+    min_group_size: int = 3,
+    max_group_size: int = 5,
+    engine: str = 'greedy',
+    workers: int = 1,
+    parallel_min_course_size: int = PARALLEL_MIN_COURSE_SIZE,
+    refine_time_budget: float = 0.0,
+    stats: Optional[Dict[str, Any]] = None,
+    cache: Optional[MatchCache] = None,
+    weights: MatchingWeights = DEFAULT_WEIGHTS,
+    course_weights: Optional[Dict[str, MatchingWeights]] = None,
+    partition_min_course_size: int = 0,
+    max_bucket_size: int = DEFAULT_MAX_BUCKET_SIZE
+) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Match students into groups, yielding results as each course finishes.
+    
+    Streaming variant of match_students: callers can persist and notify a
+    course's groups while other courses are still being matched. Cached
+    courses are yielded first, then courses in completion order; a
+    partitioned course's groups are yielded as its buckets finish. Takes the
+    same arguments as match_students.
+    
+    Results stream at course (or partition bucket) granularity, not per
+    group: the engines form all of a course's groups before any are yielded,
+    so a single large unpartitioned course arrives all at once.
+    
+    Yields:
+        ("group", course, match_record) for each formed group, then
+        ("unmatched", course, unmatched_students) once per course
     """
     if not submissions:
-        return [], []
+        return
+    
+    if engine not in MATCHING_ENGINES:
+        raise ValueError(f"Unknown matching engine: {engine}")
+    match_course = partial(
+        _match_course, engine,
+        refine_time_budget=refine_time_budget,
+        weights=weights,
+        course_weights=course_weights
+    )
     
     # Group by course first
     course_groups: Dict[str, List[Dict[str, Any]]] = {}
@@ -204,96 +899,254 @@ def match_students(
             course_groups[course] = []
         course_groups[course].append(submission)
     
-    matched_groups = []
-    unmatched_students = []
+    # Reuse results for courses whose matching inputs haven't changed
+    cached_results = {}
+    cache_keys = {}
+    if cache is not None:
+        namespace = f"matching.{engine}.v{MATCHING_ENGINE_VERSION}"
+        params = {
+            "min_group_size": min_group_size,
+            "max_group_size": max_group_size,
+            "refine_time_budget": refine_time_budget,
+            "partition_min_course_size": partition_min_course_size,
+            "max_bucket_size": max_bucket_size
+        }
+        for course, students in course_groups.items():
+            course_params = dict(params, weights=(course_weights or {}).get(course, weights).to_dict())
+            key = make_cache_key(namespace, students, MATCHING_INPUT_FIELDS, course_params)
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"Using cached matching result for course {course}")
+                cached[2]["cached"] = True
+                cached_results[course] = cached
+            else:
+                cache_keys[course] = key
     
-    # Process each course separately
+    # Very large courses are blocked into buckets that are matched as separate jobs
+    jobs: Dict[Any, Tuple[str, List[Dict[str, Any]]]] = {}
+    partitions: Dict[str, _PartitionedCourse] = {}
     for course, students in course_groups.items():
-        logger.info(f"Matching {len(students)} students for course {course}")
-        
-        # Create a copy to track unmatched
-        # Note: Students can be in multiple groups (one per course), so we don't track "used"
-        remaining = students.copy()
-        
-        # Greedy matching: repeatedly form best groups
-        while len(remaining) >= min_group_size:
-            # Start with the first unmatched student
-            if not remaining:
-                break
-            
-            group = [remaining.pop(0)]
-            group_ids = {group[0].get('id')}
+        if course in cached_results:
+            continue
+        if partition_min_course_size and len(students) >= partition_min_course_size:
+            buckets = partition_course(students, max_bucket_size)
+            logger.info(f"Partitioned {course} into {len(buckets)} buckets (largest {max(map(len, buckets))})")
+            partitions[course] = _PartitionedCourse(students, buckets)
+            for bucket_index, bucket in enumerate(buckets):
+                jobs[(course, bucket_index)] = (course, [students[i] for i in bucket])
+        else:
+            jobs[course] = (course, students)
+    
+    job_results = _iter_match_courses(
+        jobs, match_course, min_group_size, max_group_size,
+        workers, parallel_min_course_size
+    )
+    
+    # Groups of partitioned courses, kept only when the course result is cached
+    partition_groups: Dict[str, List[Dict[str, Any]]] = {}
+    
+    group_count = 0
+    unmatched_count = 0
+    for key, result in chain(cached_results.items(), job_results):
+        if isinstance(key, tuple):
+            course, bucket_index = key
+            partition = partitions[course]
             
-            # Try to add compatible students
-            while len(group) < max_group_size and remaining:
-                best_candidate = None
-                best_score = -1
-                best_index = -1
-                
-                # Find the most compatible remaining student
-                for idx, candidate in enumerate(remaining):
-                    if candidate.get('id') in group_ids:
-                        continue
-                    
-                    # Compute average compatibility with current group
-                    scores = []
-                    for member in group:
-                        score = compute_compatibility_score(member, candidate)
-                        scores.append(score)
-                    
-                    avg_score = sum(scores) / len(scores) if scores else 0.0
-                    
-                    if avg_score > best_score:
-                        best_score = avg_score
-                        best_candidate = candidate
-                        best_index = idx
-                
-                # Add candidate if compatibility is reasonable (threshold: 0.3)
-                if best_candidate and best_score >= 0.3:
-                    group.append(best_candidate)
-                    group_ids.add(best_candidate.get('id'))
-                    remaining.pop(best_index)
-                else:
-                    # No good candidates, stop growing this group
-                    break
+            bucket_groups = partition.add(bucket_index, result)
+            for group in bucket_groups:
+                yield "group", course, group
+            group_count += len(bucket_groups)
+            if course in cache_keys:
+                partition_groups.setdefault(course, []).extend(bucket_groups)
+            if not partition.done():
+                continue
             
-            # If group meets minimum size, save it
-            if len(group) >= min_group_size:
-                # Compute group metrics
-                metrics = compute_group_metrics(group)
-                
-                # Create match record
-                match_record = {
-                    "id": str(uuid.uuid4()),
-                    "course": course,
-                    "student_ids": [s.get('id') for s in group],
-                    "group_members": [
-                        {
-                            "id": s.get('id'),
-                            "name": s.get('name'),
-                            "email": s.get('email'),
-                            "study_preference": s.get('study_preference'),
-                            "location_preference": s.get('location_preference', 'Either')
-                        }
-                        for s in group
-                    ],
-                    "group_size": len(group),
-                    "availability_overlap": metrics["availability_overlap"],
-                    "preference_alignment": metrics["preference_alignment"],
-                    "location_alignment": metrics.get("location_alignment", 0.0),
-                    "avg_compatibility": metrics["avg_compatibility"]
-                }
-                
-                matched_groups.append(match_record)
-                logger.info(f"Created group of {len(group)} students for {course}")
-            else:
-                # Group too small, add back to unmatched
-                unmatched_students.extend(group)
+            result = _match_leftovers(
+                engine, course, partition, min_group_size, max_group_size, max_bucket_size,
+                refine_time_budget, weights, course_weights
+            )
+            del partitions[course]
+            if course in cache_keys:
+                cache.put(cache_keys[course], (partition_groups.pop(course) + result[0],) + result[1:])
+        else:
+            course = key
+            if course in cache_keys:
+                cache.put(cache_keys[course], result)
+        
+        course_matched, course_unmatched, course_stats = result
+        if stats is not None:
+            stats.setdefault("courses", {})[course] = course_stats
+        
+        for group in course_matched:
+            yield "group", course, group
+        yield "unmatched", course, course_unmatched
         
-        # Add remaining unmatched students
-        unmatched_students.extend(remaining)
+        group_count += len(course_matched)
+        unmatched_count += len(course_unmatched)
+    
+    logger.info(f"Matched {group_count} groups, {unmatched_count} unmatched students")
+
+
+def match_students(
+    submissions: List[Dict[str, Any]],
+    min_group_size: int = 3,
+    max_group_size: int = 5,
+    engine: str = 'greedy',
+    workers: int = 1,
+    parallel_min_course_size: int = PARALLEL_MIN_COURSE_SIZE,
+    refine_time_budget: float = 0.0,
+    stats: Optional[Dict[str, Any]] = None,
+    cache: Optional[MatchCache] = None,
+    weights: MatchingWeights = DEFAULT_WEIGHTS,
+    course_weights: Optional[Dict[str, MatchingWeights]] = None,
+    partition_min_course_size: int = 0,
+    max_bucket_size: int = DEFAULT_MAX_BUCKET_SIZE
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Match students into groups using a greedy algorithm.
+    
+    Args:
+        submissions: List of student submission dictionaries
+        min_group_size: Minimum group size (default 3)
+        max_group_size: Maximum group size (default 5)
+        engine: Per-course engine: 'greedy' (default), 'matrix' (requires numpy)
+            or 'indexed' (slot-index candidate pruning); all produce the same groups
+        workers: Number of worker processes for matching courses in parallel (default 1)
+        parallel_min_course_size: Courses smaller than this are always matched inline
+        refine_time_budget: Seconds per course of swap/move refinement after the
+            greedy pass (default 0, disabled; requires numpy)
+        stats: Optional dictionary to fill with per-course run statistics
+        cache: Optional MatchCache; courses whose inputs are unchanged reuse
+            the stored result instead of being matched again
+        weights: Score term weights (default 0.6/0.25/0.15)
+        course_weights: Optional per-course weights overriding weights
+        partition_min_course_size: Courses with at least this many students are
+            blocked into buckets by location and availability, matched per
+            bucket (in parallel with workers > 1), then given a cross-bucket
+            pass over the leftovers (default 0, disabled)
+        max_bucket_size: Maximum students per bucket in partitioned mode
     
-    logger.info(f"Matched {len(matched_groups)} groups, {len(unmatched_students)} unmatched students")
+    Returns:
+        Tuple of (matched_groups, unmatched_students)
+    """
+    course_results: Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = {
+        submission.get('course', 'UNKNOWN'): ([], []) for submission in submissions
+    }
+    run_stats: Dict[str, Any] = {}
+    
+    for kind, course, payload in iter_match_students(
+        submissions, min_group_size, max_group_size, engine, workers,
+        parallel_min_course_size, refine_time_budget, run_stats, cache,
+        weights, course_weights, partition_min_course_size, max_bucket_size
+    ):
+        if kind == "group":
+            course_results[course][0].append(payload)
+        else:
+            course_results[course][1].extend(payload)
+    
+    # Merge in course order so output does not depend on worker timing
+    matched_groups = []
+    unmatched_students = []
+    for course, (course_matched, course_unmatched) in course_results.items():
+        matched_groups.extend(course_matched)
+        unmatched_students.extend(course_unmatched)
+        if stats is not None and course in run_stats.get("courses", {}):
+            stats.setdefault("courses", {})[course] = run_stats["courses"][course]
     
     return matched_groups, unmatched_students
 
+
+def place_submission(
+    submission: Dict[str, Any],
+    open_groups: List[Dict[str, Any]],
+    waiting: List[Dict[str, Any]],
+    submissions_by_id: Dict[str, Dict[str, Any]],
+    min_group_size: int = 3,
+    max_group_size: int = 5,
+    weights: MatchingWeights = DEFAULT_WEIGHTS,
+    engine: str = 'greedy'
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Incrementally place a new submission without re-matching its course.
+    
+    The newcomer joins the most compatible existing group with a free seat.
+    If no group clears MIN_GROUP_COMPATIBILITY, it joins the course's waiting pool,
+    and once the pool reaches min_group_size the pool is matched into new
+    groups. Only the affected groups are returned.
+    
+    Args:
+        submission: The new student submission
+        open_groups: Existing match records for the course
+        waiting: Course submissions not yet in any group (excluding the newcomer)
+        submissions_by_id: Course submissions keyed by id, for group member lookup
+        min_group_size: Minimum group size (default 3)
+        max_group_size: Maximum group size (default 5)
+        weights: Score term weights for the course
+        engine: Engine from MATCHING_ENGINES that matches a full waiting pool
+    
+    Returns:
+        Tuple of (updated_groups, new_groups); updated groups keep their id
+    """
+    if engine not in MATCHING_ENGINES:
+        raise ValueError(f"Unknown matching engine: {engine}")
+    
+    course = submission.get('course', 'UNKNOWN')
+    submission_id = submission.get('id')
+    
+    candidates: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+    for group in open_groups:
+        student_ids = group.get('student_ids', [])
+        if len(student_ids) >= max_group_size or submission_id in student_ids:
+            continue
+        
+        # Skip groups whose members can't all be scored (e.g. deleted submissions)
+        members = [submissions_by_id[sid] for sid in student_ids if sid in submissions_by_id]
+        if not members or len(members) != len(student_ids):
+            continue
+        candidates.append((group, members))
+    
+    # Newcomer is index 0; each candidate group's members follow in order
+    scorer = WeightedScorer(
+        [submission] + [member for _, members in candidates for member in members], weights
+    )
+    
+    best_group = None
+    best_members: List[Dict[str, Any]] = []
+    best_indices: List[int] = []
+    best_score = -1
+    
+    start = 1
+    for group, members in candidates:
+        indices = list(range(start, start + len(members)))
+        start += len(members)
+        avg_score = sum(scorer.scores(0, indices)) / len(members)
+        
+        if avg_score > best_score:
+            best_score = avg_score
+            best_group = group
+            best_members = members
+            best_indices = indices
+    
+    # Join an existing group if compatibility is reasonable (threshold: MIN_GROUP_COMPATIBILITY)
+    if best_group is not None and best_score >= MIN_GROUP_COMPATIBILITY:
+        group_indices = best_indices + [0]
+        updated_group = _build_match_record(
+            course, best_members + [submission], scorer.group_metrics(group_indices),
+            meeting_times=rank_meeting_times(
+                scorer.student_records.encoder, [scorer.records[i].mask for i in group_indices]
+            )
+        )
+        updated_group['id'] = best_group.get('id')
+        logger.info(f"Placed {submission_id} into group {updated_group['id']} for {course}")
+        return [updated_group], []
+    
+    # Otherwise wait for enough unplaced students to form a new group
+    pool = waiting + [submission]
+    if len(pool) < min_group_size:
+        logger.info(f"{submission_id} waiting for a group in {course} ({len(pool)} waiting)")
+        return [], []
+    
+    new_groups, _, _ = _match_course(
+        engine, course, pool, min_group_size, max_group_size, weights=weights
+    )
+    return [], new_groups
@@ -25,6 +25,7 @@ class Match:
     members: List[Member] = None
     compatibility_score: float = 0.0
     suggested_meeting_time: str = ''
+    suggested_meeting_times: List[str] = None
     created_at: Optional[str] = None
     feedback_sent: bool = False
     feedback_due_date: Optional[str] = None
@@ -33,6 +34,8 @@ class Match:
         """Initialize default values."""
         if self.members is None:
             self.members = []
+        if self.suggested_meeting_times is None:
+            self.suggested_meeting_times = []
         if self.created_at is None:
             self.created_at = datetime.utcnow().isoformat()
     
@@ -0,0 +1,110 @@
+"""
+Blocking of very large courses into buckets for partitioned matching.
+
+Students are first split by location preference, since In-person and
+Virtual students never pair well, with "Either" students used to balance
+the two blocks. Blocks larger than the bucket size are then bisected
+recursively on the availability slot that splits them most evenly, so
+students in a bucket tend to share (or share the absence of) slots. Each
+bucket can be matched independently with memory bounded by its size.
+"""
+from typing import Any, Dict, List
+
+from availability import AvailabilityEncoder, iter_slot_ids
+
+# Default maximum number of students per bucket
+DEFAULT_MAX_BUCKET_SIZE = 500
+
+
+def location_blocks(students: List[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Split a course into In-person and Virtual blocks.
+
+    Students who are flexible ("Either", or no usable preference) pair with
+    both and are assigned to whichever block is smaller at the time.
+
+    Args:
+        students: Submissions for one course
+
+    Returns:
+        Non-empty blocks as sorted index lists into students
+    """
+    in_person: List[int] = []
+    virtual: List[int] = []
+    flexible: List[int] = []
+
+    for index, student in enumerate(students):
+        location = student.get('location_preference', 'Either')
+        location = location.strip() if isinstance(location, str) else ''
+        if location == 'In-person':
+            in_person.append(index)
+        elif location == 'Virtual':
+            virtual.append(index)
+        else:
+            flexible.append(index)
+
+    for index in flexible:
+        (in_person if len(in_person) <= len(virtual) else virtual).append(index)
+
+    return [sorted(block) for block in (in_person, virtual) if block]
+
+
+def split_by_availability(indices: List[int], masks: List[int], max_bucket_size: int) -> List[List[int]]:
+    """
+    Recursively bisect a block on availability until every part fits a bucket.
+
+    Each split uses the slot held by the number of students closest to half
+    the block; blocks no slot can split are cut in half by position.
+
+    Args:
+        indices: Sorted student indices of the block
+        masks: Availability bitmask of every student in the course
+        max_bucket_size: Maximum students per bucket
+
+    Returns:
+        Buckets as sorted index lists
+    """
+    if len(indices) <= max_bucket_size:
+        return [indices]
+
+    slot_counts: Dict[int, int] = {}
+    for index in indices:
+        for slot_id in iter_slot_ids(masks[index]):
+            slot_counts[slot_id] = slot_counts.get(slot_id, 0) + 1
+
+    half = len(indices) / 2
+    split_slot = min(slot_counts, key=lambda slot_id: (abs(slot_counts[slot_id] - half), slot_id), default=None)
+
+    if split_slot is None or slot_counts[split_slot] == len(indices):
+        middle = len(indices) // 2
+        with_slot, without_slot = indices[:middle], indices[middle:]
+    else:
+        bit = 1 << split_slot
+        with_slot = [index for index in indices if masks[index] & bit]
+        without_slot = [index for index in indices if not masks[index] & bit]
+
+    return (split_by_availability(with_slot, masks, max_bucket_size) +
+            split_by_availability(without_slot, masks, max_bucket_size))
+
+
+def partition_course(students: List[Dict[str, Any]], max_bucket_size: int = DEFAULT_MAX_BUCKET_SIZE) -> List[List[int]]:
+    """
+    Block a course into buckets of at most max_bucket_size students.
+
+    Args:
+        students: Submissions for one course
+        max_bucket_size: Maximum students per bucket
+
+    Returns:
+        Buckets as sorted index lists into students, covering every student once
+    """
+    if max_bucket_size < 1:
+        raise ValueError("max_bucket_size must be at least 1")
+
+    encoder = AvailabilityEncoder()
+    masks = [encoder.encode(s.get('availability', [])) for s in students]
+
+    buckets: List[List[int]] = []
+    for block in location_blocks(students):
+        buckets.extend(split_by_availability(block, masks, max_bucket_size))
+    return buckets
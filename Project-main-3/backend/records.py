@@ -0,0 +1,100 @@
+"""
+Compact student records for the matching hot path.
+
+Submissions are converted once per course into slotted StudentRecords that
+hold only what scoring needs: an interned id, the availability bitmask and
+small-int codes for study_preference and location_preference. Engines work
+on records by index and map back to the submission dicts when building
+match records.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from alignment import compute_location_alignment, compute_preference_alignment
+from availability import AvailabilityEncoder
+
+# Code of a missing/empty study_preference or location_preference
+MISSING_CODE = 0
+
+
+class StudentRecord:
+    """Matching features of one submission."""
+
+    __slots__ = ('id_code', 'mask', 'size', 'preference_code', 'location_code')
+
+    def __init__(self, id_code: int, mask: int, preference_code: int, location_code: int):
+        self.id_code = id_code
+        self.mask = mask
+        self.size = mask.bit_count()
+        self.preference_code = preference_code
+        self.location_code = location_code
+
+
+class StudentRecords:
+    """A course's StudentRecords with the vocabularies their codes refer to."""
+
+    def __init__(self, students: List[Dict[str, Any]], encoder: Optional[AvailabilityEncoder] = None):
+        """
+        Build records for a course.
+
+        Preference and location values are interned by their stripped text, as
+        the alignment functions compare them; missing or empty values share
+        MISSING_CODE.
+
+        Args:
+            students: Submissions for one course
+            encoder: Availability encoder to intern slots with (default: new encoder)
+        """
+        self.encoder = encoder or AvailabilityEncoder()
+        self.ids: List[Any] = []
+        # Representative raw value for each code, for building alignment tables
+        self.preferences: List[Any] = ['']
+        self.locations: List[Any] = ['']
+
+        id_codes: Dict[Any, int] = {}
+        preference_codes: Dict[str, int] = {}
+        location_codes: Dict[str, int] = {}
+
+        def intern(value: Any, codes: Dict[str, int], values: List[Any]) -> int:
+            if not value:
+                return MISSING_CODE
+            key = value.strip()
+            if key not in codes:
+                codes[key] = len(values)
+                values.append(value)
+            return codes[key]
+
+        self.records: List[StudentRecord] = []
+        for student in students:
+            student_id = student.get('id')
+            if student_id not in id_codes:
+                id_codes[student_id] = len(self.ids)
+                self.ids.append(student_id)
+            self.records.append(StudentRecord(
+                id_codes[student_id],
+                self.encoder.encode(student.get('availability', [])),
+                intern(student.get('study_preference', ''), preference_codes, self.preferences),
+                intern(student.get('location_preference', 'Either'), location_codes, self.locations)
+            ))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> StudentRecord:
+        return self.records[index]
+
+    def alignment_tables(self) -> Tuple[List[List[float]], List[List[float]]]:
+        """
+        Preference and location alignment for every pair of codes.
+
+        Returns:
+            Tuple of (preference_table, location_table) indexed by two codes
+        """
+        preference_table = [
+            [compute_preference_alignment(pref1, pref2) for pref2 in self.preferences]
+            for pref1 in self.preferences
+        ]
+        location_table = [
+            [compute_location_alignment(loc1, loc2) for loc2 in self.locations]
+            for loc1 in self.locations
+        ]
+        return preference_table, location_table
@@ -0,0 +1,214 @@
+"""
+Weighted compatibility scoring compiled once per course.
+
+A WeightedScorer is compiled from a course's submissions and a
+MatchingWeights config: submissions become StudentRecords (availability
+bitmask plus preference and location codes) and the weighted alignment terms
+of every pair of codes are precomputed. Scoring a pair is then a popcount
+plus two table lookups, and gives the same result as
+compute_compatibility_score with the same weights.
+"""
+import math
+from dataclasses import dataclass, asdict, fields, replace
+from numbers import Real
+from typing import Any, Dict, List, Optional
+
+from availability import AvailabilityEncoder, mask_overlap
+from records import StudentRecords
+
+
+@dataclass(frozen=True)
+class MatchingWeights:
+    """Weights of the availability, preference and location score terms."""
+
+    availability: float = 0.6
+    preference: float = 0.25
+    location: float = 0.15
+
+    def __post_init__(self):
+        # Branch-and-bound pruning bounds group scores from above, which only
+        # holds when every term adds a non-negative amount
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"Matching weight {field.name} must be a non-negative number, got {value}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: Optional['MatchingWeights'] = None) -> 'MatchingWeights':
+        """
+        Create weights from a dictionary; missing terms are taken from base.
+
+        Args:
+            data: e.g. {"availability": 0.8, "preference": 0.2, "location": 0.0}
+            base: Weights for missing terms (default: DEFAULT_WEIGHTS)
+
+        Returns:
+            MatchingWeights instance
+
+        Raises:
+            ValueError: If a term is unknown, non-numeric or negative
+        """
+        unknown = set(data) - {'availability', 'preference', 'location'}
+        if unknown:
+            raise ValueError(f"Unknown matching weights: {', '.join(sorted(unknown))}")
+        for key, value in data.items():
+            if isinstance(value, bool) or not isinstance(value, Real):
+                raise ValueError(f"Matching weight {key} must be a number, got {value!r}")
+        return replace(base or cls(), **{key: float(value) for key, value in data.items()})
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+DEFAULT_WEIGHTS = MatchingWeights()
+
+
+class WeightedScorer:
+    """Pairwise scores and group metrics over a course's StudentRecords."""
+
+    def __init__(self, students: List[Dict[str, Any]], weights: MatchingWeights = DEFAULT_WEIGHTS,
+                 encoder: Optional[AvailabilityEncoder] = None):
+        """
+        Compile the scorer for a course.
+
+        Args:
+            students: Submissions for one course; scores are addressed by index
+            weights: Score term weights
+            encoder: Availability encoder to intern slots with (default: new encoder)
+        """
+        self.weights = weights
+        self.student_records = StudentRecords(students, encoder)
+        self.records = self.student_records.records
+
+        self.preference_table, self.location_table = self.student_records.alignment_tables()
+        self.preference_terms = [
+            [weights.preference * value for value in row] for row in self.preference_table
+        ]
+        self.location_terms = [
+            [weights.location * value for value in row] for row in self.location_table
+        ]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def score(self, i: int, j: int) -> float:
+        """
+        Compatibility score of students i and j.
+
+        Args:
+            i: Index of student 1
+            j: Index of student 2
+
+        Returns:
+            Compatibility score between 0 and 1
+        """
+        first = self.records[i]
+        second = self.records[j]
+        return (self.weights.availability * mask_overlap(first.mask, second.mask)) + \
+            self.preference_terms[first.preference_code][second.preference_code] + \
+            self.location_terms[first.location_code][second.location_code]
+
+    def scores(self, i: int, candidates: List[int]) -> List[float]:
+        """
+        Compatibility scores of student i against many candidates.
+
+        Args:
+            i: Index of the student
+            candidates: Indices of the candidates
+
+        Returns:
+            Score for each candidate, in order
+        """
+        availability_weight = self.weights.availability
+        records = self.records
+        student = records[i]
+        mask = student.mask
+        preference_terms = self.preference_terms[student.preference_code]
+        location_terms = self.location_terms[student.location_code]
+        return [
+            (availability_weight * mask_overlap(mask, records[j].mask)) +
+            preference_terms[records[j].preference_code] +
+            location_terms[records[j].location_code]
+            for j in candidates
+        ]
+
+    def disjoint_score(self, i: int, preference_code: int, location_code: int) -> float:
+        """
+        Score of student i against any student sharing no slots with it.
+
+        Args:
+            i: Index of the student
+            preference_code: The other student's preference code
+            location_code: The other student's location code
+
+        Returns:
+            Compatibility score with zero availability overlap
+        """
+        student = self.records[i]
+        return (self.weights.availability * 0.0) + \
+            self.preference_terms[student.preference_code][preference_code] + \
+            self.location_terms[student.location_code][location_code]
+
+    def upper_bound(self, i: int, j: int) -> float:
+        """
+        Cheap upper bound on score(i, j).
+
+        Jaccard overlap of sets of sizes a and b is at most min(a, b) / max(a, b).
+
+        Args:
+            i: Index of student 1
+            j: Index of student 2
+
+        Returns:
+            Upper bound on the compatibility score
+        """
+        first = self.records[i]
+        second = self.records[j]
+        other_terms = self.preference_terms[first.preference_code][second.preference_code] + \
+            self.location_terms[first.location_code][second.location_code]
+        if not first.size or not second.size:
+            return other_terms
+        return self.weights.availability * min(first.size, second.size) / max(first.size, second.size) + other_terms
+
+    def group_metrics(self, indices: List[int]) -> Dict[str, Any]:
+        """
+        Aggregate metrics for a group; same result as compute_group_metrics.
+
+        Args:
+            indices: Indices of the group members
+
+        Returns:
+            Dictionary with group metrics
+        """
+        if len(indices) < 2:
+            return {
+                "availability_overlap": 0.0,
+                "preference_alignment": 0.0,
+                "avg_compatibility": 0.0
+            }
+
+        availability_overlaps = []
+        preference_alignments = []
+        location_alignments = []
+
+        members = [self.records[i] for i in indices]
+        for position, first in enumerate(members):
+            for second in members[position + 1:]:
+                availability_overlaps.append(mask_overlap(first.mask, second.mask))
+                preference_alignments.append(self.preference_table[first.preference_code][second.preference_code])
+                location_alignments.append(self.location_table[first.location_code][second.location_code])
+
+        avg_availability_overlap = sum(availability_overlaps) / len(availability_overlaps)
+        avg_preference_alignment = sum(preference_alignments) / len(preference_alignments)
+        avg_location_alignment = sum(location_alignments) / len(location_alignments)
+        avg_compatibility = (self.weights.availability * avg_availability_overlap) + \
+                            (self.weights.preference * avg_preference_alignment) + \
+                            (self.weights.location * avg_location_alignment)
+
+        return {
+            "availability_overlap": round(avg_availability_overlap, 3),
+            "preference_alignment": round(avg_preference_alignment, 3),
+            "location_alignment": round(avg_location_alignment, 3),
+            "avg_compatibility": round(avg_compatibility, 3)
+        }
@@ -0,0 +1,201 @@
+"""
+Size-constrained assignment of students to study groups.
+
+Clustering decides which students belong together but not how many; this
+stage turns its clusters into groups that all fall within [min, max] in one
+pass. Each group is seeded with a medoid drawn from the clusters, and students
+are assigned to medoids from most to least compatible under a capacity of
+max_group_size, holding back enough students to bring every group up to
+min_group_size (balanced k-medoids). Medoids are then re-centered on their
+groups and the assignment repeated.
+"""
+from typing import Callable, List, Optional
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Most compatible medoids kept as assignment candidates per student
+BALANCE_CANDIDATES = 16
+
+# Assignment passes; medoids are re-centered on their groups between passes
+BALANCE_ITERATIONS = 2
+
+# (stop - start) x len(columns) compatibility scores of students start..stop-1
+# against the students in columns (default: all students)
+RowScores = Callable[[int, int, Optional[np.ndarray]], np.ndarray]
+
+# len(indices) x len(indices) compatibility scores among the given students
+BlockScores = Callable[[List[int]], np.ndarray]
+
+
+def group_count(n: int, min_group_size: int, max_group_size: int) -> int:
+    """
+    Number of groups to form from n students.
+
+    The fewest groups that fit everyone under max_group_size, or when those
+    cannot all reach min_group_size, as many groups as min_group_size allows.
+
+    Args:
+        n: Number of students
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+
+    Returns:
+        Number of groups (0 if n < min_group_size)
+    """
+    n_groups = -(-n // max_group_size)
+    if n_groups * min_group_size > n:
+        n_groups = n // min_group_size
+    return n_groups
+
+
+def select_medoids(clusters: List[List[int]], n_groups: int, block: BlockScores) -> List[int]:
+    """
+    Pick n_groups seed students from the clusters.
+
+    Medoids are shared out among clusters by size, largest first. Within a
+    cluster the first medoid is the member most compatible with the rest, and
+    each further one the member least compatible with the medoids so far.
+
+    Args:
+        clusters: Clusters as index lists
+        n_groups: Number of medoids
+        block: Compatibility scores among given students
+
+    Returns:
+        Student index of each medoid
+    """
+    ordered = sorted(clusters, key=len, reverse=True)[:n_groups]
+    quotas = [1] * len(ordered)
+    for _ in range(n_groups - len(ordered)):
+        c = max(range(len(ordered)), key=lambda c: len(ordered[c]) / quotas[c])
+        quotas[c] += 1
+
+    medoids: List[int] = []
+    for cluster, quota in zip(ordered, quotas):
+        scores = block(cluster)
+        chosen = [int(np.argmax(scores.sum(axis=1)))]
+        while len(chosen) < min(quota, len(cluster)):
+            nearest = scores[:, chosen].max(axis=1)
+            nearest[chosen] = np.inf
+            chosen.append(int(np.argmin(nearest)))
+        medoids.extend(cluster[c] for c in chosen)
+
+    # Only short when clusters have fewer members than their quota
+    if len(medoids) < n_groups:
+        taken = set(medoids)
+        spare = (i for cluster in clusters for i in cluster if i not in taken)
+        medoids.extend(next(spare) for _ in range(n_groups - len(medoids)))
+    return medoids
+
+
+def assign_to_medoids(n: int, medoids: List[int], min_group_size: int, max_group_size: int,
+                      rows: RowScores, block_rows: int) -> List[List[int]]:
+    """
+    Assign every student to a medoid's group within the size bounds.
+
+    (student, medoid) candidate pairs are taken from most to least compatible.
+    A student joins a group with room unless doing so would leave too few
+    unassigned students to bring every group up to min_group_size. Students
+    whose candidates all filled up go to the most compatible group still open.
+
+    Args:
+        n: Number of students
+        medoids: Seed student of each group
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        rows: Compatibility scores of a block of students against given students
+        block_rows: Students scored per call to rows
+
+    Returns:
+        Groups as index lists, medoid first; students that fit nowhere are left out
+    """
+    n_groups = len(medoids)
+    medoid_index = np.array(medoids, dtype=np.intp)
+    k = min(BALANCE_CANDIDATES, n_groups)
+
+    candidates = np.empty((n, k), dtype=np.intp)
+    candidate_scores = np.empty((n, k), dtype=np.float64)
+    for start in range(0, n, block_rows):
+        stop = min(n, start + block_rows)
+        scores = rows(start, stop, medoid_index)
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidates[start:stop] = best
+        candidate_scores[start:stop] = np.take_along_axis(scores, best, axis=1)
+
+    groups: List[List[int]] = [[medoid] for medoid in medoids]
+    assigned = np.zeros(n, dtype=bool)
+    assigned[medoid_index] = True
+    unassigned = n - n_groups
+    deficit = n_groups * max(0, min_group_size - 1)
+
+    def place(i: int, g: int) -> None:
+        nonlocal unassigned, deficit
+        if len(groups[g]) < min_group_size:
+            deficit -= 1
+        groups[g].append(i)
+        assigned[i] = True
+        unassigned -= 1
+
+    def has_room(g: int) -> bool:
+        size = len(groups[g])
+        return size < min_group_size or (size < max_group_size and unassigned > deficit)
+
+    # Stable sort on negated scores: ties go to the lower student, then the better-ranked candidate
+    order = np.argsort(-candidate_scores.ravel(), kind='stable')
+    for pair in order.tolist():
+        i, c = divmod(pair, k)
+        if assigned[i]:
+            continue
+        g = int(candidates[i, c])
+        if has_room(g):
+            place(i, g)
+
+    for i in np.flatnonzero(~assigned).tolist():
+        open_groups = [g for g in range(n_groups) if has_room(g)]
+        if not open_groups:
+            break
+        scores = rows(i, i + 1, medoid_index[open_groups])[0]
+        place(i, open_groups[int(np.argmax(scores))])
+
+    return groups
+
+
+def balance_groups(labels: np.ndarray, min_group_size: int, max_group_size: int,
+                   rows: RowScores, block: BlockScores, block_rows: int) -> List[List[int]]:
+    """
+    Turn cluster labels into groups of min_group_size to max_group_size students.
+
+    Args:
+        labels: Cluster label of each student
+        min_group_size: Minimum group size
+        max_group_size: Maximum group size
+        rows: Compatibility scores of a block of students against given students
+        block: Compatibility scores among given students
+        block_rows: Students scored per call to rows
+
+    Returns:
+        Groups as sorted index lists, ordered by first member; every student is
+        placed unless the course cannot be split into groups within the bounds
+    """
+    n = len(labels)
+    n_groups = group_count(n, min_group_size, max_group_size)
+    if n_groups == 0:
+        return []
+
+    clusters = {}
+    for i, label in enumerate(labels.tolist()):
+        clusters.setdefault(label, []).append(i)
+    medoids = select_medoids(list(clusters.values()), n_groups, block)
+
+    groups: List[List[int]] = []
+    for iteration in range(BALANCE_ITERATIONS):
+        if iteration:
+            medoids = [group[int(np.argmax(block(group).sum(axis=1)))] for group in groups]
+        groups = assign_to_medoids(n, medoids, min_group_size, max_group_size, rows, block_rows)
+
+    placed = sum(len(group) for group in groups)
+    if placed < n:
+        logger.warning(f"{n - placed} of {n} students do not fit groups of {min_group_size}-{max_group_size}")
+    return sorted((sorted(group) for group in groups), key=lambda group: group[0])
@@ -1,20 +1,45 @@
 """
 Group clustering and matching logic.
 """
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 import numpy as np
+from scipy import sparse
+from scipy.cluster.hierarchy import cut_tree, linkage
 from sklearn.cluster import AgglomerativeClustering
 import logging
+import tracemalloc
+from backend.availability import suggest_meeting_times
+from backend.match_cache import MatchCache, make_cache_key
 from backend.models.submission import Submission
-from backend.src.aggregation.scoring import CompatibilityScorer
+from backend.src.aggregation.balancing import RowScores, balance_groups
+from backend.src.aggregation.scoring import SCORE_BLOCK_ELEMENTS, CompatibilityScorer
 
 logger = logging.getLogger(__name__)
 
+# Bump when a change to the clustering alters its output, to invalidate cached results
+CLUSTERING_VERSION = 3
+
+# Submission fields that affect a course's clustering result
+CLUSTERING_INPUT_FIELDS = ('id', 'pennkey', 'availability', 'study_style', 'goal')
+
+# Courses with at least this many students are clustered on a sparse kNN graph
+DEFAULT_SPARSE_MIN_SIZE = 2000
+
+# Neighbors kept per student in the sparse kNN graph
+DEFAULT_N_NEIGHBORS = 15
+
+# Score storage for courses below the sparse threshold: 'dense' keeps the full
+# float64 matrix, 'condensed' only its upper triangle in float32
+MATRIX_STORAGES = ('dense', 'condensed')
+
 
 class GroupMatcher:
     """Matches students into optimal study groups."""
     
-    def __init__(self, scorer: CompatibilityScorer, min_group_size: int = 3, max_group_size: int = 5):
+    def __init__(self, scorer: CompatibilityScorer, min_group_size: int = 3, max_group_size: int = 5,
+                 cache: Optional[MatchCache] = None, sparse_min_size: int = DEFAULT_SPARSE_MIN_SIZE,
+                 n_neighbors: int = DEFAULT_N_NEIGHBORS, storage: str = 'dense',
+                 measure_memory: bool = False):
         """
         Initialize group matcher.
         
@@ -22,18 +47,39 @@ class GroupMatcher:
             scorer: Compatibility scorer instance
             min_group_size: Minimum group size
             max_group_size: Maximum group size
+            cache: Optional result cache, e.g. the app's MatchCache instance
+                also passed to matching.match_students
+            sparse_min_size: Cluster courses of at least this many students on a
+                sparse kNN graph instead of the full distance matrix (0 disables)
+            n_neighbors: Neighbors per student in the sparse kNN graph
+            storage: 'dense' or 'condensed' score storage below sparse_min_size
+            measure_memory: Trace allocations with tracemalloc to report
+                "peak_memory_bytes" in stats; slows matching down noticeably
         """
+        if storage not in MATRIX_STORAGES:
+            raise ValueError(f"Unknown matrix storage: {storage}")
         self.scorer = scorer
         self.min_group_size = min_group_size
         self.max_group_size = max_group_size
+        self.cache = cache
+        self.sparse_min_size = sparse_min_size
+        self.n_neighbors = n_neighbors
+        self.storage = storage
+        self.measure_memory = measure_memory
     
-    def match_students(self, validated_submissions: List[Submission], course_id: str) -> List[Dict]:
+    def match_students(self, validated_submissions: List[Submission], course_id: str,
+                       stats: Optional[Dict[str, Any]] = None) -> List[Dict]:
         """
         Match students into groups.
         
         Args:
             validated_submissions: List of validated submissions
             course_id: Course identifier
+            stats: Optional dict that receives run statistics: "students",
+                "storage", "groups", "unmatched", "cached" and, unless cached,
+                "score_bytes" (size of the stored scores); "peak_memory_bytes"
+                (traced peak while scoring and clustering) is added when
+                measure_memory is set and tracemalloc was not already running
             
         Returns:
             List of match dictionaries
@@ -42,20 +88,134 @@ class GroupMatcher:
             logger.warning(f"Insufficient participants: {len(validated_submissions)} < {self.min_group_size}")
             return []
         
-        # Build compatibility matrix
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(
+                f"clustering.v{CLUSTERING_VERSION}",
+                [vars(sub) for sub in validated_submissions],
+                CLUSTERING_INPUT_FIELDS,
+                {
+                    "course_id": course_id,
+                    "min_group_size": self.min_group_size,
+                    "max_group_size": self.max_group_size,
+                    "sparse_min_size": self.sparse_min_size,
+                    "n_neighbors": self.n_neighbors,
+                    "storage": self.storage,
+                    "weights": [
+                        self.scorer.AVAILABILITY_WEIGHT,
+                        self.scorer.STUDY_STYLE_WEIGHT,
+                        self.scorer.GOAL_WEIGHT
+                    ]
+                }
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Using cached clustering result for {course_id}")
+                if stats is not None:
+                    stats.update({"students": len(validated_submissions), "cached": True})
+                return cached
+        
         n = len(validated_submissions)
-        compatibility_matrix = np.zeros((n, n))
+        if self.sparse_min_size and n >= self.sparse_min_size:
+            storage = 'sparse'
+        else:
+            storage = self.storage
         
-        submission_dicts = [sub.to_dict() for sub in validated_submissions]
+        # Trace memory only while the score storage is alive; a caller's own
+        # tracing is left alone, as measuring would reset its peak
+        started_tracing = (stats is not None and self.measure_memory
+                           and not tracemalloc.is_tracing())
+        if started_tracing:
+            tracemalloc.start()
         
-        for i in range(n):
-            for j in range(i+1, n):
-                compat = self.scorer.calculate_compatibility(
-                    submission_dicts[i],
-                    submission_dicts[j]
-                )
-                compatibility_matrix[i][j] = compat
-                compatibility_matrix[j][i] = compat
+        try:
+            if storage == 'sparse':
+                encoded = self.scorer.encode_students(validated_submissions)
+                score_bytes = sum(column.nbytes for column in encoded.values())
+                
+                def rows(start: int, stop: int, columns: Optional[np.ndarray] = None) -> np.ndarray:
+                    return self.scorer.calculate_compatibility_rows(encoded, start, stop, columns)
+                
+                def block(indices: List[int]) -> np.ndarray:
+                    return self.scorer.calculate_compatibility_matrix([validated_submissions[i] for i in indices])
+                
+                labels = self._sparse_labels(n, rows)
+            elif storage == 'condensed':
+                # float32 upper-triangle scores, turned into distances in place
+                # for linkage; rows and block read them back as 1 - distance
+                distances = self.scorer.calculate_condensed_compatibility(validated_submissions)
+                np.subtract(1, distances, out=distances)
+                score_bytes = distances.nbytes
+                
+                def rows(start: int, stop: int, columns: Optional[np.ndarray] = None) -> np.ndarray:
+                    if columns is None:
+                        columns = np.arange(n)
+                    return _condensed_scores(distances, n, np.arange(start, stop)[:, None], columns[None, :])
+                
+                def block(indices: List[int]) -> np.ndarray:
+                    indices = np.asarray(indices)
+                    return _condensed_scores(distances, n, indices[:, None], indices[None, :])
+                
+                labels = self._condensed_labels(distances, n)
+            else:
+                compatibility_matrix = self.scorer.calculate_compatibility_matrix(validated_submissions)
+                score_bytes = compatibility_matrix.nbytes
+                
+                def rows(start: int, stop: int, columns: Optional[np.ndarray] = None) -> np.ndarray:
+                    block_rows = compatibility_matrix[start:stop]
+                    return block_rows if columns is None else block_rows[:, columns]
+                
+                def block(indices: List[int]) -> np.ndarray:
+                    return compatibility_matrix[np.ix_(indices, indices)]
+                
+                labels = self._dense_labels(compatibility_matrix)
+            
+            # Assign students to groups within the size bounds
+            groups = balance_groups(
+                labels, self.min_group_size, self.max_group_size,
+                rows, block, max(1, SCORE_BLOCK_ELEMENTS // n)
+            )
+        finally:
+            if started_tracing:
+                peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        
+        final_groups = [[validated_submissions[i] for i in group] for group in groups]
+        
+        # Format groups
+        formatted_groups = []
+        for group_id, group_members in enumerate(final_groups, start=1):
+            formatted_group = self._format_group(group_members, course_id, group_id)
+            formatted_groups.append(formatted_group)
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, formatted_groups)
+        
+        if stats is not None:
+            stats.update({
+                "students": n,
+                "storage": storage,
+                "groups": len(formatted_groups),
+                "unmatched": n - sum(len(group) for group in groups),
+                "cached": False,
+                "score_bytes": score_bytes
+            })
+            if started_tracing:
+                stats["peak_memory_bytes"] = peak_memory_bytes
+        
+        return formatted_groups
+    
+    def _dense_labels(self, compatibility_matrix: np.ndarray) -> np.ndarray:
+        """
+        Cluster students with average linkage on the full distance matrix.
+        
+        Args:
+            compatibility_matrix: n x n compatibility scores
+            
+        Returns:
+            Cluster label for each student
+        """
+        n = compatibility_matrix.shape[0]
         
         # Calculate number of clusters based on desired group size
         n_clusters = max(1, n // self.max_group_size)
@@ -71,88 +231,113 @@ class GroupMatcher:
         )
         
         try:
-            labels = clustering.fit_predict(distance_matrix)
+            return clustering.fit_predict(distance_matrix)
         except Exception as e:
             logger.error(f"Clustering failed: {e}")
             # Fallback: simple grouping
-            labels = self._simple_grouping(n, self.max_group_size)
+            return self._simple_grouping(n, self.max_group_size)
+    
+    def _condensed_labels(self, distances: np.ndarray, n: int) -> np.ndarray:
+        """
+        Cluster students with average linkage on condensed distances.
         
-        # Group by cluster
-        groups = {}
-        for idx, label in enumerate(labels):
-            if label not in groups:
-                groups[label] = []
-            groups[label].append(validated_submissions[idx])
+        Args:
+            distances: Condensed upper triangle of the distance matrix
+            n: Number of students
+            
+        Returns:
+            Cluster label for each student
+        """
+        n_clusters = max(1, n // self.max_group_size)
         
-        # Adjust group sizes
-        final_groups = self._adjust_group_sizes(groups)
+        try:
+            # linkage takes the condensed form directly; no square matrix is built
+            tree = linkage(distances, method='average')
+            return cut_tree(tree, n_clusters=[n_clusters])[:, 0]
+        except Exception as e:
+            logger.error(f"Clustering failed: {e}")
+            # Fallback: simple grouping
+            return self._simple_grouping(n, self.max_group_size)
+    
+    def _sparse_labels(self, n: int, rows: RowScores) -> np.ndarray:
+        """
+        Cluster students on a sparse k-nearest-neighbor compatibility graph.
         
-        # Format groups
-        formatted_groups = []
-        for group_id, group_members in enumerate(final_groups, start=1):
-            formatted_group = self._format_group(group_members, course_id, group_id)
-            formatted_groups.append(formatted_group)
+        Edges are merged from most to least compatible, joining two clusters
+        only while the result fits max_group_size (a size-capped maximum
+        spanning forest). Memory scales with n * n_neighbors rather than n^2.
         
-        return formatted_groups
-    
-    def _simple_grouping(self, n: int, max_size: int) -> np.ndarray:
-        """Simple grouping fallback."""
-        labels = []
-        for i in range(n):
-            labels.append(i // max_size)
-        return np.array(labels)
+        Args:
+            n: Number of students
+            rows: Compatibility scores of a block of students against all students
+            
+        Returns:
+            Cluster label for each student
+        """
+        graph = sparse.triu(self._knn_graph(n, rows), k=1).tocoo()
+        order = np.argsort(-graph.data, kind='stable')
+        
+        parent = list(range(n))
+        sizes = [1] * n
+        
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        for edge in order.tolist():
+            root_i = find(int(graph.row[edge]))
+            root_j = find(int(graph.col[edge]))
+            if root_i == root_j or sizes[root_i] + sizes[root_j] > self.max_group_size:
+                continue
+            if sizes[root_i] < sizes[root_j]:
+                root_i, root_j = root_j, root_i
+            parent[root_j] = root_i
+            sizes[root_i] += sizes[root_j]
+        
+        logger.info(f"Clustered {n} students on a {self.n_neighbors}-NN graph with {graph.nnz} edges")
+        return np.array([find(i) for i in range(n)])
     
-    def _adjust_group_sizes(self, groups: Dict[int, List[Submission]]) -> List[List[Submission]]:
+    def _knn_graph(self, n: int, rows: RowScores) -> sparse.csr_matrix:
         """
-        Adjust group sizes to fit within min/max constraints.
+        Build the symmetric k-nearest-neighbor graph of compatibility scores.
+        
+        Scores are computed in row blocks of about SCORE_BLOCK_ELEMENTS entries,
+        keeping only each student's n_neighbors most compatible others.
         
         Args:
-            groups: Dictionary mapping cluster labels to submissions
+            n: Number of students
+            rows: Compatibility scores of a block of students against all students
             
         Returns:
-            List of adjusted groups
+            n x n sparse matrix with compatibility scores as edge weights
         """
-        final_groups = []
-        all_students = []
-        
-        # Separate groups that are too small or too large
-        for cluster_id, members in groups.items():
-            if len(members) < self.min_group_size:
-                # Too small - add to pool for redistribution
-                all_students.extend(members)
-            elif len(members) <= self.max_group_size:
-                # Good size
-                final_groups.append(members)
-            else:
-                # Too large - split into multiple groups
-                num_splits = (len(members) + self.max_group_size - 1) // self.max_group_size
-                split_size = len(members) // num_splits
-                
-                for i in range(num_splits):
-                    start = i * split_size
-                    end = start + split_size if i < num_splits - 1 else len(members)
-                    final_groups.append(members[start:end])
-        
-        # Redistribute students from small groups
-        if all_students:
-            # Try to add to existing groups or create new ones
-            for student in all_students:
-                added = False
-                # Try to add to existing groups that are below max size
-                for group in final_groups:
-                    if len(group) < self.max_group_size:
-                        group.append(student)
-                        added = True
-                        break
-                
-                # If not added, create new group
-                if not added:
-                    final_groups.append([student])
+        k = max(1, min(self.n_neighbors, n - 1))
+        block_rows = max(1, SCORE_BLOCK_ELEMENTS // n)
         
-        # Remove groups that are still too small
-        final_groups = [g for g in final_groups if len(g) >= self.min_group_size]
+        neighbors = np.empty((n, k), dtype=np.intp)
+        weights = np.empty((n, k), dtype=np.float64)
+        for start in range(0, n, block_rows):
+            stop = min(n, start + block_rows)
+            scores = np.array(rows(start, stop))
+            scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            nearest = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            neighbors[start:stop] = nearest
+            weights[start:stop] = np.take_along_axis(scores, nearest, axis=1)
         
-        return final_groups
+        graph = sparse.csr_matrix(
+            (weights.ravel(), (np.repeat(np.arange(n), k), neighbors.ravel())),
+            shape=(n, n)
+        )
+        return graph.maximum(graph.T)
+    
+    def _simple_grouping(self, n: int, max_size: int) -> np.ndarray:
+        """Simple grouping fallback."""
+        labels = []
+        for i in range(n):
+            labels.append(i // max_size)
+        return np.array(labels)
     
     def _format_group(self, members: List[Submission], course_id: str, group_id: int) -> Dict:
         """
@@ -170,20 +355,20 @@ class GroupMatcher:
         
         # Calculate average compatibility
         compat_scores = []
+        member_dicts = [member.to_dict() for member in members]
         for i in range(len(members)):
             for j in range(i+1, len(members)):
                 score = self.scorer.calculate_compatibility(
-                    members[i].to_dict(),
-                    members[j].to_dict()
+                    member_dicts[i],
+                    member_dicts[j]
                 )
                 compat_scores.append(score)
         
         avg_compat = sum(compat_scores) / len(compat_scores) if compat_scores else 0.0
         
-        # Find common availability slot
-        all_availabilities = [set(m.availability) for m in members]
-        common_slots = set.intersection(*all_availabilities) if all_availabilities else set()
-        suggested_time = list(common_slots)[0] if common_slots else (members[0].availability[0] if members[0].availability else '')
+        # Rank meeting times: slots everyone shares, then the most widely shared
+        suggested_times = suggest_meeting_times([m.availability for m in members])
+        suggested_time = suggested_times[0] if suggested_times else ''
         
         # Create member objects
         match_members = []
@@ -199,8 +384,32 @@ class GroupMatcher:
             course=course_id,
             members=match_members,
             compatibility_score=avg_compat,
-            suggested_meeting_time=suggested_time
+            suggested_meeting_time=suggested_time,
+            suggested_meeting_times=suggested_times
         )
         
         return match.to_dict()
 
+
+def _condensed_scores(distances: np.ndarray, n: int, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """
+    Read compatibility scores back from condensed distances.
+    
+    Args:
+        distances: Condensed upper triangle of the distance matrix
+        n: Number of students
+        rows: Row indices, broadcast against columns
+        columns: Column indices
+        
+    Returns:
+        float64 compatibility scores, zero where row equals column
+    """
+    if not distances.size:
+        return np.zeros(np.broadcast(rows, columns).shape)
+    first = np.minimum(rows, columns)
+    second = np.maximum(rows, columns)
+    index = n * first - first * (first + 1) // 2 + second - first - 1
+    diagonal = first == second
+    scores = 1.0 - distances[np.where(diagonal, 0, index)].astype(np.float64)
+    scores[diagonal] = 0.0
+    return scores
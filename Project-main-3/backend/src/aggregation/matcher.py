@@ -61,7 +61,8 @@ class MatchOrchestrator:
         logger.info(f"Running matching for {course_id} with {len(submissions)} participants")
         
         # Run matching algorithm
-        groups = self.matcher.match_students(submissions, course_id)
+        stats = {}
+        groups = self.matcher.match_students(submissions, course_id, stats=stats)
         
         if not groups:
             logger.warning(f"No groups formed for {course_id}")
@@ -70,7 +71,8 @@ class MatchOrchestrator:
                 'matches_created': 0,
                 'match_ids': [],
                 'timestamp': datetime.utcnow().isoformat(),
-                'message': 'No groups could be formed'
+                'message': 'No groups could be formed',
+                'stats': stats
             }
         
         # Store matches in Firebase and send emails
@@ -108,6 +110,7 @@ class MatchOrchestrator:
             'course_id': course_id,
             'matches_created': len(match_ids),
             'match_ids': match_ids,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow().isoformat(),
+            'stats': stats
         }
 
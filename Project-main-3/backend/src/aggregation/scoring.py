@@ -1,11 +1,16 @@
 """
 Compatibility scoring for student matching.
 """
-from typing import Dict
+from typing import Any, Dict, List, Optional, Sequence, Union
 import logging
+import numpy as np
+from backend.models.submission import Submission
 
 logger = logging.getLogger(__name__)
 
+# Compatibility scores computed per row block when scoring without the full matrix
+SCORE_BLOCK_ELEMENTS = 1 << 18
+
 
 class CompatibilityScorer:
     """Calculates compatibility scores between students."""
@@ -51,6 +56,125 @@ class CompatibilityScorer:
         
         return score
     
+    def calculate_compatibility_matrix(self, students: Sequence[Union[Dict, Submission]]) -> np.ndarray:
+        """
+        Calculate compatibility scores between all pairs of students at once.
+        
+        Availability, study_style and goal are encoded into columns and scored
+        with NumPy broadcasting instead of one calculate_compatibility call per
+        pair. Off-diagonal entries equal calculate_compatibility exactly.
+        
+        Args:
+            students: Submission dictionaries or Submission objects
+            
+        Returns:
+            n x n float64 matrix of compatibility scores with a zero diagonal
+        """
+        encoded = self.encode_students(students)
+        score = self.calculate_compatibility_rows(encoded, 0, len(students))
+        np.fill_diagonal(score, 0.0)
+        return score
+    
+    def calculate_condensed_compatibility(self, students: Sequence[Union[Dict, Submission]],
+                                          dtype: type = np.float32) -> np.ndarray:
+        """
+        Calculate the upper triangle of the compatibility matrix, row by row.
+        
+        The result uses scipy's condensed layout (pairs (0, 1), (0, 2), ...,
+        (1, 2), ...) and is filled in row blocks, so no square matrix is held.
+        
+        Args:
+            students: Submission dictionaries or Submission objects
+            dtype: Storage type of the scores (default float32)
+            
+        Returns:
+            1-D array of n * (n - 1) / 2 compatibility scores
+        """
+        n = len(students)
+        encoded = self.encode_students(students)
+        condensed = np.empty(n * (n - 1) // 2, dtype=dtype)
+        block_rows = max(1, SCORE_BLOCK_ELEMENTS // max(1, n))
+        
+        offset = 0
+        for start in range(0, n, block_rows):
+            stop = min(n, start + block_rows)
+            # Scores of rows start..stop-1 against students start+1..n-1
+            scores = self.calculate_compatibility_rows(encoded, start, stop, slice(start + 1, None))
+            for r in range(stop - start):
+                length = n - start - r - 1
+                condensed[offset:offset + length] = scores[r, r:]
+                offset += length
+        return condensed
+    
+    def encode_students(self, students: Sequence[Union[Dict, Submission]]) -> Dict[str, np.ndarray]:
+        """
+        Encode the scored fields of many students into NumPy columns.
+        
+        Args:
+            students: Submission dictionaries or Submission objects
+            
+        Returns:
+            Dictionary with an n x slots availability bit matrix ("bits"), the
+            availability list lengths ("lengths") and case-folded category codes
+            ("study_style", "goal"; -1 where unset)
+        """
+        availabilities = [_get_field(s, 'availability') or [] for s in students]
+        
+        slot_ids: Dict[Any, int] = {}
+        rows = []
+        cols = []
+        for i, availability in enumerate(availabilities):
+            for slot in set(availability):
+                rows.append(i)
+                cols.append(slot_ids.setdefault(slot, len(slot_ids)))
+        
+        bits = np.zeros((len(availabilities), len(slot_ids)), dtype=np.float64)
+        bits[rows, cols] = 1.0
+        
+        return {
+            'bits': bits,
+            # Like the pairwise score, normalize by list length (duplicates included)
+            'lengths': np.array([len(availability) for availability in availabilities], dtype=np.float64),
+            'study_style': _category_codes([_get_field(s, 'study_style') for s in students]),
+            'goal': _category_codes([_get_field(s, 'goal') for s in students])
+        }
+    
+    def calculate_compatibility_rows(self, encoded: Dict[str, np.ndarray], start: int, stop: int,
+                                     columns: Optional[Union[np.ndarray, slice]] = None) -> np.ndarray:
+        """
+        Calculate compatibility of students start..stop-1 against other students.
+        
+        Scoring a course in row blocks bounds memory by the block size instead
+        of the full matrix. Entries equal calculate_compatibility exactly,
+        including each student's score against itself.
+        
+        Args:
+            encoded: Columns from encode_students
+            start: First row
+            stop: End of the rows (exclusive)
+            columns: Indices or slice of the students to score against (default: all)
+            
+        Returns:
+            (stop - start) x len(columns) float64 matrix of compatibility scores
+        """
+        if columns is None:
+            columns = slice(None)
+        bits = encoded['bits']
+        lengths = encoded['lengths']
+        row_lengths = lengths[start:stop, None]
+        column_lengths = lengths[None, columns]
+        
+        overlap = bits[start:stop] @ bits[columns].T
+        max_avail = np.maximum(row_lengths, column_lengths)
+        avail_score = np.zeros(overlap.shape)
+        nonempty = (row_lengths > 0) & (column_lengths > 0)
+        np.divide(overlap, max_avail, out=avail_score, where=nonempty)
+        
+        score = 0.0 + self.AVAILABILITY_WEIGHT * np.minimum(1.0, avail_score)
+        score += self.STUDY_STYLE_WEIGHT * _match_rows(encoded['study_style'], start, stop, columns)
+        score += self.GOAL_WEIGHT * _match_rows(encoded['goal'], start, stop, columns)
+        return score
+    
     def _calculate_availability_score(self, avail1: list, avail2: list) -> float:
         """
         Calculate availability overlap score.
@@ -107,3 +231,45 @@ class CompatibilityScorer:
         
         return 1.0 if goal1.lower() == goal2.lower() else 0.0
 
+
+
+def _get_field(student: Union[Dict, Submission], name: str) -> Any:
+    """Read a field from a submission dictionary or Submission object."""
+    if isinstance(student, dict):
+        return student.get(name, '')
+    return getattr(student, name, '')
+
+
+def _category_codes(values: List[Any]) -> np.ndarray:
+    """
+    Intern a categorical column case-insensitively.
+    
+    Args:
+        values: Column value for each student
+        
+    Returns:
+        Code for each student, -1 where the value is unset
+    """
+    codes: Dict[str, int] = {}
+    return np.array(
+        [codes.setdefault(value.lower(), len(codes)) if value else -1 for value in values],
+        dtype=np.intp
+    )
+
+
+def _match_rows(column: np.ndarray, start: int, stop: int, columns: Union[np.ndarray, slice]) -> np.ndarray:
+    """
+    Pairwise equality of rows start..stop-1 of a coded column against other rows.
+    
+    Args:
+        column: Codes from _category_codes
+        start: First row
+        stop: End of the rows (exclusive)
+        columns: Rows to compare against
+        
+    Returns:
+        (stop - start) x len(columns) matrix, 1.0 where both values are set and equal
+    """
+    block = column[start:stop, None]
+    matches = (block == column[None, columns]) & (block >= 0)
+    return matches.astype(np.float64)
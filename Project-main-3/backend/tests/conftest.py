@@ -0,0 +1,183 @@
+"""
+Shared fixtures for the backend tests.
+
+Run from the backend directory with `pytest tests/`.
+"""
+import os
+import random
+import re
+import signal
+import sys
+import types
+from collections import Counter
+from typing import Any, Dict, List
+
+import pytest
+
+# The Flask app imports backend modules by their flat names (e.g. `matching`);
+# src/ modules are imported as the `backend` package from the project root
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (BACKEND_DIR, os.path.dirname(BACKEND_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+SLOTS = [f"{day} {hours}" for day in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+         for hours in ('10am-12pm', '2pm-4pm', '4pm-6pm')]
+PREFERENCES = ['PSets', ' PSets ', 'Exam Prep', 'Mixed', '', None]
+LOCATIONS = ['In-person', 'Virtual', 'Either', ' Either', '']
+
+
+def random_submissions(seed: int, n: int, courses: int = 3) -> List[Dict[str, Any]]:
+    """
+    Seeded submissions including the awkward inputs the engines must agree on:
+    empty availability, missing or blank preferences, padded values and
+    duplicate ids.
+    """
+    rng = random.Random(seed)
+    submissions = []
+    for i in range(n):
+        submission = {
+            'id': f"dup{rng.randrange(3)}" if rng.random() < 0.05 else f"s{i}",
+            'name': f"Student {i}",
+            'email': f"student{i}@upenn.edu",
+            'course': f"CIS{1000 + rng.randrange(courses)}",
+            'availability': rng.sample(SLOTS, rng.randint(0, 6)) if rng.random() > 0.05 else [],
+            'study_preference': rng.choice(PREFERENCES),
+            'location_preference': rng.choice(LOCATIONS),
+        }
+        if rng.random() < 0.05:
+            del submission['location_preference']
+        submissions.append(submission)
+    return submissions
+
+
+@pytest.fixture
+def make_submissions():
+    """Factory for seeded random submissions."""
+    return random_submissions
+
+
+class FakeWorksheet:
+    """In-memory stand-in for the gspread worksheet calls SheetsDB makes."""
+
+    def __init__(self, header: List[str]):
+        self.rows = [list(header)]
+        self.calls = Counter()
+
+    def append_row(self, row):
+        self.calls['append_row'] += 1
+        self.rows.append([str(value) for value in row])
+
+    def append_rows(self, rows):
+        self.calls['append_rows'] += 1
+        self.rows.extend([str(value) for value in row] for row in rows)
+
+    def get_all_records(self):
+        self.calls['get_all_records'] += 1
+        return [dict(zip(self.rows[0], row)) for row in self.rows[1:]]
+
+    def col_values(self, column):
+        self.calls['col_values'] += 1
+        return [row[column - 1] for row in self.rows]
+
+    def batch_get(self, ranges):
+        self.calls['batch_get'] += 1
+        values = []
+        for cell_range in ranges:
+            column, start = re.match(r'([A-Z])(\d+):[A-Z]$', cell_range).groups()
+            index = ord(column) - ord('A')
+            values.append([[row[index]] if row[index] else [] for row in self.rows[int(start) - 1:]])
+        return values
+
+    def batch_update(self, updates):
+        self.calls['batch_update'] += 1
+        for update in updates:
+            row_number = int(re.match(r'A(\d+):', update['range']).group(1))
+            self.rows[row_number - 1] = [str(value) for value in update['values'][0]]
+
+
+@pytest.fixture
+def sheets_db(monkeypatch):
+    """Factory for SheetsDB instances backed by FakeWorksheets instead of gspread."""
+    from db import SheetsDB
+
+    worksheets = {}
+
+    class FakeSpreadsheet:
+        def worksheet(self, name):
+            return worksheets[name]
+
+    gspread = types.ModuleType('gspread')
+    gspread.authorize = lambda creds: types.SimpleNamespace(open_by_key=lambda sheet_id: FakeSpreadsheet())
+    service_account = types.ModuleType('google.oauth2.service_account')
+    service_account.Credentials = types.SimpleNamespace(from_service_account_file=lambda path, scopes: None)
+    monkeypatch.setitem(sys.modules, 'gspread', gspread)
+    monkeypatch.setitem(sys.modules, 'google', types.ModuleType('google'))
+    monkeypatch.setitem(sys.modules, 'google.oauth2', types.ModuleType('google.oauth2'))
+    monkeypatch.setitem(sys.modules, 'google.oauth2.service_account', service_account)
+
+    created = []
+    # Write-behind instances install a SIGTERM handler
+    sigterm_handler = signal.getsignal(signal.SIGTERM)
+
+    def make(**kwargs) -> SheetsDB:
+        worksheets['Submissions'] = FakeWorksheet(
+            ['id', 'name', 'email', 'course', 'availability', 'study_preference', 'data']
+        )
+        worksheets['Matches'] = FakeWorksheet(['id', 'student_ids', 'group_members', 'data'])
+        database = SheetsDB('sheet-id', 'credentials.json', **kwargs)
+        created.append(database)
+        return database
+
+    yield make
+    for database in created:
+        if database.write_behind:
+            database.close()
+    signal.signal(signal.SIGTERM, sigterm_handler)
+
+
+class FakeFirestoreBatch:
+    """Records the writes of one WriteBatch."""
+
+    def __init__(self):
+        self.writes = []
+        self.committed = False
+
+    def set(self, reference, data):
+        assert not self.committed
+        self.writes.append((reference, dict(data)))
+
+    def commit(self):
+        self.committed = True
+
+
+class FakeFirestoreClient:
+    """In-memory stand-in for the Firestore client calls FirestoreDB makes."""
+
+    def __init__(self):
+        self.batches: List[FakeFirestoreBatch] = []
+
+    def batch(self):
+        self.batches.append(FakeFirestoreBatch())
+        return self.batches[-1]
+
+    def collection(self, name):
+        return types.SimpleNamespace(document=lambda document_id: (name, document_id))
+
+
+@pytest.fixture
+def firestore_db(monkeypatch):
+    """FirestoreDB backed by a FakeFirestoreClient instead of firebase-admin."""
+    from db import FirestoreDB
+
+    firestore = types.ModuleType('firebase_admin.firestore')
+    firestore.SERVER_TIMESTAMP = 'SERVER_TIMESTAMP'
+    firestore.client = FakeFirestoreClient
+    firebase_admin = types.ModuleType('firebase_admin')
+    firebase_admin._apps = {'[DEFAULT]': None}
+    firebase_admin.credentials = types.ModuleType('firebase_admin.credentials')
+    firebase_admin.firestore = firestore
+    monkeypatch.setitem(sys.modules, 'firebase_admin', firebase_admin)
+    monkeypatch.setitem(sys.modules, 'firebase_admin.credentials', firebase_admin.credentials)
+    monkeypatch.setitem(sys.modules, 'firebase_admin.firestore', firestore)
+    return FirestoreDB('project-id', '')
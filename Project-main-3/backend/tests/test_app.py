@@ -0,0 +1,61 @@
+"""
+Flask route tests, run against a fresh InMemoryDB.
+"""
+import pytest
+
+import app as app_module
+from db import InMemoryDB
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = InMemoryDB()
+    monkeypatch.setattr(app_module, 'db', database)
+    monkeypatch.setattr(app_module, 'match_cache', None)
+    return database
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_match_saves_each_course_before_the_next_is_matched(db, client, monkeypatch, make_submissions):
+    for submission in make_submissions(8, 45):
+        db.save_submission(submission)
+    events = []
+
+    stream = app_module.iter_match_students
+
+    def recording_stream(*args, **kwargs):
+        for kind, course, payload in stream(*args, **kwargs):
+            events.append((kind, course))
+            yield kind, course, payload
+
+    save_matches = db.save_matches
+
+    def recording_save(matches):
+        events.append(('save', tuple(sorted({match['course'] for match in matches}))))
+        return save_matches(matches)
+
+    monkeypatch.setattr(app_module, 'iter_match_students', recording_stream)
+    monkeypatch.setattr(db, 'save_matches', recording_save)
+
+    response = client.post('/match', json={})
+
+    assert response.status_code == 200
+    courses = [course for kind, course in events if kind == 'unmatched']
+    assert sorted(courses) == ['CIS1000', 'CIS1001', 'CIS1002']
+    # Every course is saved in one batch right after it completes, before the
+    # next course's groups arrive
+    expected = []
+    grouped = set()
+    for kind, course in events:
+        if kind == 'group':
+            expected.append((kind, course))
+            grouped.add(course)
+        elif kind == 'unmatched':
+            expected.extend([(kind, course), ('save', (course,) if course in grouped else ())])
+    assert events == expected
+    assert response.get_json()['matches_created'] == sum(kind == 'group' for kind, _ in events)
+    assert len(db.matches) == response.get_json()['matches_created']
@@ -0,0 +1,76 @@
+"""
+Availability bitmasks and meeting-time ranking.
+"""
+import copy
+
+from availability import (
+    AvailabilityEncoder, mask_overlap, rank_meeting_slots, rank_meeting_times, suggest_meeting_times
+)
+from matching import compute_availability_overlap, match_students
+
+
+def test_rank_meeting_slots_orders_common_then_by_count_then_slot():
+    # Slots 0..4; slot 3 is shared by everyone, slot 1 by two members
+    masks = [0b01011, 0b01110, 0b11010]
+
+    assert rank_meeting_slots(masks, top_k=5) == [(1, 3), (3, 3), (0, 1), (2, 1), (4, 1)]
+    assert rank_meeting_slots(masks, top_k=1) == [(1, 3)]
+
+
+def test_rank_meeting_slots_breaks_count_ties_by_slot_id():
+    masks = [0b1100, 0b0011, 0b1001]
+
+    assert rank_meeting_slots(masks, top_k=4) == [(0, 2), (3, 2), (1, 1), (2, 1)]
+
+
+def test_rank_meeting_slots_empty_inputs():
+    assert rank_meeting_slots([]) == []
+    assert rank_meeting_slots([0b1], top_k=0) == []
+    assert rank_meeting_slots([0, 0]) == []
+
+
+def test_suggest_meeting_times_ranks_shared_slots_first():
+    availabilities = [
+        ['Monday 2pm-4pm', 'Tuesday 2pm-4pm'],
+        ['Tuesday 2pm-4pm', 'Friday 10am-12pm'],
+        ['Tuesday 2pm-4pm', 'Monday 2pm-4pm'],
+    ]
+
+    assert suggest_meeting_times(availabilities) == ['Tuesday 2pm-4pm', 'Monday 2pm-4pm', 'Friday 10am-12pm']
+
+
+def test_rank_meeting_times_uses_the_given_encoder():
+    encoder = AvailabilityEncoder()
+    masks = [encoder.encode(['Friday 4pm-6pm', 'Monday 2pm-4pm']), encoder.encode(['Monday 2pm-4pm'])]
+
+    assert rank_meeting_times(encoder, masks, top_k=2) == ['Monday 2pm-4pm', 'Friday 4pm-6pm']
+
+
+def test_mask_overlap_matches_set_overlap(make_submissions):
+    students = make_submissions(1, 40)
+    encoder = AvailabilityEncoder()
+    masks = [encoder.encode(s.get('availability', [])) for s in students]
+
+    for i, first in enumerate(students):
+        for j, second in enumerate(students):
+            assert mask_overlap(masks[i], masks[j]) == compute_availability_overlap(
+                first.get('availability', []), second.get('availability', [])
+            )
+
+
+def test_match_records_rank_meeting_times_by_members_available(make_submissions):
+    submissions = make_submissions(2, 90)
+    for index, submission in enumerate(submissions):
+        submission['id'] = f"u{index}"
+    by_id = {s['id']: s for s in submissions}
+
+    groups, _ = match_students(copy.deepcopy(submissions), 3, 5)
+
+    for group in groups:
+        availabilities = [by_id[sid].get('availability', []) for sid in group['student_ids']]
+        counts = [sum(slot in availability for availability in availabilities)
+                  for slot in group['suggested_meeting_times']]
+        expected = suggest_meeting_times(availabilities)
+        assert counts == [sum(slot in availability for availability in availabilities) for slot in expected]
+        assert counts == sorted(counts, reverse=True)
+        assert group['suggested_meeting_time'] == (group['suggested_meeting_times'] or [''])[0]
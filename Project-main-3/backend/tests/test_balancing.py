@@ -0,0 +1,56 @@
+"""
+Invariant tests for size-constrained group balancing.
+"""
+import numpy as np
+import pytest
+
+from backend.src.aggregation.balancing import balance_groups, group_count
+
+
+def balance(scores: np.ndarray, labels: np.ndarray, min_group_size: int, max_group_size: int,
+            block_rows: int = 7):
+    def rows(start, stop, columns=None):
+        block = scores[start:stop]
+        return block if columns is None else block[:, columns]
+
+    def block(indices):
+        return scores[np.ix_(indices, indices)]
+
+    return balance_groups(labels, min_group_size, max_group_size, rows, block, block_rows)
+
+
+@pytest.mark.parametrize('n', [3, 4, 7, 13, 50, 101])
+@pytest.mark.parametrize('bounds', [(3, 5), (2, 4), (4, 4)])
+@pytest.mark.parametrize('clusters', [1, 3, 40])
+def test_every_student_placed_once_within_bounds(n, bounds, clusters):
+    min_group_size, max_group_size = bounds
+    rng = np.random.default_rng(n * 100 + clusters)
+    scores = rng.random((n, n))
+    scores = (scores + scores.T) / 2
+    labels = rng.integers(0, clusters, size=n)
+
+    groups = balance(scores, labels, min_group_size, max_group_size)
+
+    placed = [i for group in groups for i in group]
+    assert len(placed) == len(set(placed))
+    assert all(min_group_size <= len(group) <= max_group_size for group in groups)
+    assert len(groups) == group_count(n, min_group_size, max_group_size)
+    assert groups == sorted((sorted(group) for group in groups), key=lambda group: group[0])
+    # Everyone fits whenever the groups can absorb them
+    if len(groups) * max_group_size >= n:
+        assert sorted(placed) == list(range(n))
+
+
+def test_too_few_students_forms_no_groups():
+    scores = np.ones((2, 2))
+    assert balance(scores, np.zeros(2, dtype=int), 3, 5) == []
+
+
+def test_block_rows_does_not_change_groups():
+    rng = np.random.default_rng(7)
+    n = 60
+    scores = rng.random((n, n))
+    scores = (scores + scores.T) / 2
+    labels = rng.integers(0, 6, size=n)
+
+    assert balance(scores, labels, 3, 5, block_rows=1) == balance(scores, labels, 3, 5, block_rows=n)
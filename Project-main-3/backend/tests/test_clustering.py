@@ -0,0 +1,119 @@
+"""
+GroupMatcher tests.
+"""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from backend.benchmarks.workload import WorkloadConfig, generate_submissions
+from backend.models.submission import Submission
+from backend.src.aggregation.clustering import GroupMatcher
+from backend.src.aggregation.scoring import CompatibilityScorer
+# The app builds its cache from the flat module name; GroupMatcher must accept that instance
+from match_cache import MatchCache
+
+
+# GroupMatcher arguments selecting each score storage
+STORAGES = {
+    'dense': {'sparse_min_size': 0},
+    'condensed': {'sparse_min_size': 0, 'storage': 'condensed'},
+    'sparse': {'sparse_min_size': 1},
+}
+
+
+def course_submissions(n: int, seed: int = 3):
+    return [
+        Submission(id=s['id'], pennkey=s['pennkey'], course=s['course'], availability=s['availability'],
+                   study_style=s['study_style'], goal=s['goal'], status='validated')
+        for s in generate_submissions(WorkloadConfig(seed=seed, students_per_course=n))
+    ]
+
+
+def member_sets(groups):
+    return sorted(tuple(sorted(member['pennkey'] for member in group['members'])) for group in groups)
+
+
+def test_cache_round_trip():
+    submissions = course_submissions(50)
+    cache = MatchCache()
+    matcher = GroupMatcher(CompatibilityScorer(), 3, 5, cache=cache)
+    first_stats = {}
+    second_stats = {}
+
+    first = matcher.match_students(submissions, 'CIS1200', stats=first_stats)
+    second = matcher.match_students(submissions, 'CIS1200', stats=second_stats)
+
+    assert second == first
+    assert not first_stats['cached'] and second_stats['cached']
+    assert cache.stats()['hits'] == 1
+
+
+@pytest.mark.parametrize('n', [3, 7, 13, 200])
+@pytest.mark.parametrize('storage', STORAGES)
+def test_groups_within_bounds(n, storage):
+    submissions = course_submissions(n)
+    matcher = GroupMatcher(CompatibilityScorer(), 3, 5, **STORAGES[storage])
+    stats = {}
+
+    groups = matcher.match_students(submissions, 'CIS1200', stats=stats)
+
+    placed = [member['pennkey'] for group in groups for member in group['members']]
+    assert len(placed) == len(set(placed)) == n
+    assert all(3 <= len(group['members']) <= 5 for group in groups)
+    assert stats['storage'] == storage
+    assert 'peak_memory_bytes' not in stats
+
+
+def test_condensed_storage_matches_dense():
+    submissions = course_submissions(200)
+    dense = GroupMatcher(CompatibilityScorer(), 3, 5, sparse_min_size=0)
+    condensed = GroupMatcher(CompatibilityScorer(), 3, 5, sparse_min_size=0, storage='condensed')
+
+    assert member_sets(condensed.match_students(submissions, 'CIS1200')) == \
+        member_sets(dense.match_students(submissions, 'CIS1200'))
+
+
+def test_condensed_scores_equal_matrix_upper_triangle():
+    scorer = CompatibilityScorer()
+    submissions = course_submissions(40)
+
+    condensed = scorer.calculate_condensed_compatibility(submissions)
+
+    matrix = scorer.calculate_compatibility_matrix(submissions)
+    assert condensed.dtype == np.float32
+    assert np.array_equal(condensed, matrix[np.triu_indices(len(submissions), k=1)].astype(np.float32))
+
+
+def test_unknown_storage_is_rejected():
+    with pytest.raises(ValueError):
+        GroupMatcher(CompatibilityScorer(), storage='triangular')
+
+
+def test_memory_measurement_is_opt_in():
+    submissions = course_submissions(30)
+    stats = {}
+
+    GroupMatcher(CompatibilityScorer(), 3, 5, measure_memory=True).match_students(submissions, 'CIS1200', stats=stats)
+
+    assert stats['peak_memory_bytes'] > 0
+    assert stats['score_bytes'] > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_measurement_leaves_caller_tracing_alone():
+    submissions = course_submissions(30)
+    stats = {}
+    tracemalloc.start()
+    try:
+        ballast = bytearray(4 * 1024 * 1024)
+        del ballast
+        peak = tracemalloc.get_traced_memory()[1]
+        GroupMatcher(CompatibilityScorer(), 3, 5, measure_memory=True).match_students(
+            submissions, 'CIS1200', stats=stats
+        )
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[1] >= peak
+    finally:
+        tracemalloc.stop()
+    assert 'peak_memory_bytes' not in stats
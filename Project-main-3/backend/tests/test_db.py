@@ -0,0 +1,89 @@
+"""
+InMemoryDB secondary indexes must always agree with a full scan.
+"""
+import random
+
+import pytest
+
+from db import InMemoryDB
+
+
+def assert_indexes_consistent(db: InMemoryDB):
+    submissions = list(db.submissions.values())
+    matches = list(db.matches.values())
+    pennkeys = {s.get('pennkey') for s in submissions} | {'nobody'}
+    courses = {s.get('course') for s in submissions} | {m.get('course') for m in matches} | {'NONE'}
+    student_ids = {sid for m in matches for sid in m.get('student_ids', [])} | {'missing'}
+
+    for pennkey in pennkeys:
+        assert db.get_submissions_by_pennkey(pennkey) == [s for s in submissions if s.get('pennkey') == pennkey]
+        for course in courses:
+            expected = [s for s in submissions if s.get('pennkey') == pennkey and s.get('course') == course]
+            assert db.find_submission(pennkey, course) == (expected[0] if expected else None)
+    for course in courses:
+        assert db.get_submissions_by_course(course) == [s for s in submissions if s.get('course') == course]
+        assert ({m['id'] for m in db.get_matches_by_course(course)} ==
+                {m['id'] for m in matches if m.get('course') == course})
+    for student_id in student_ids:
+        assert ({m['id'] for m in db.get_matches_by_student(student_id)} ==
+                {m['id'] for m in matches if student_id in m.get('student_ids', [])})
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_indexes_match_full_scan(seed):
+    rng = random.Random(seed)
+    db = InMemoryDB()
+    for _ in range(40):
+        db.save_submission({'pennkey': f"user{rng.randrange(10)}", 'course': f"CIS{rng.randrange(4)}"})
+    ids = list(db.submissions)
+    for _ in range(10):
+        db.save_match({'course': f"CIS{rng.randrange(4)}", 'student_ids': rng.sample(ids, 3)})
+
+    assert_indexes_consistent(db)
+
+
+def test_indexes_follow_update_match():
+    db = InMemoryDB()
+    match_id = db.save_match({'course': 'CIS1200', 'student_ids': ['a', 'b', 'c']})
+
+    db.update_match(match_id, {'student_ids': ['a', 'd', 'e', 'f']})
+    assert_indexes_consistent(db)
+    assert db.get_matches_by_student('b') == []
+    assert [m['id'] for m in db.get_matches_by_student('f')] == [match_id]
+
+    db.update_match(match_id, {'course': 'CIS1600'})
+    assert_indexes_consistent(db)
+    assert db.get_matches_by_course('CIS1200') == []
+    assert [m['id'] for m in db.get_matches_by_course('CIS1600')] == [match_id]
+
+
+def test_update_match_reindexes_records_changed_in_place():
+    db = InMemoryDB()
+    match_id = db.save_match({'course': 'CIS1200', 'student_ids': ['a', 'b', 'c']})
+
+    # Callers may mutate the stored record before writing it back
+    match = db.get_match(match_id)
+    match['student_ids'].remove('b')
+    match['student_ids'].append('g')
+    match['course'] = 'CIS1210'
+    db.update_match(match_id, match)
+
+    assert_indexes_consistent(db)
+    assert db.get_matches_by_student('b') == []
+    assert db.get_matches_by_course('CIS1200') == []
+
+
+def test_update_match_creates_missing_match():
+    db = InMemoryDB()
+    db.update_match('new-id', {'course': 'CIS1200', 'student_ids': ['a']})
+
+    assert_indexes_consistent(db)
+    assert db.get_match('new-id')['id'] == 'new-id'
+
+
+def test_find_submission_returns_first_saved():
+    db = InMemoryDB()
+    first = db.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+    db.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+
+    assert db.find_submission('alice', 'CIS1200')['id'] == first
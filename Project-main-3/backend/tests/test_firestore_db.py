@@ -0,0 +1,23 @@
+"""
+FirestoreDB tests, run against an in-memory client.
+"""
+import pytest
+
+from db import FIRESTORE_BATCH_LIMIT
+
+
+@pytest.mark.parametrize('n', [0, 1, FIRESTORE_BATCH_LIMIT, 2 * FIRESTORE_BATCH_LIMIT + 201])
+def test_save_matches_commits_full_batches_in_order(firestore_db, n):
+    matches = [{'course': 'CIS1200', 'student_ids': [f"s{i}"]} for i in range(n)]
+
+    match_ids = firestore_db.save_matches(matches)
+
+    batches = firestore_db.db.batches
+    assert [len(batch.writes) for batch in batches] == \
+        [min(FIRESTORE_BATCH_LIMIT, n - start) for start in range(0, n, FIRESTORE_BATCH_LIMIT)]
+    assert all(batch.committed for batch in batches)
+    writes = [write for batch in batches for write in batch.writes]
+    assert [reference for reference, _ in writes] == [('matches', match_id) for match_id in match_ids]
+    assert [data['student_ids'] for _, data in writes] == [[f"s{i}"] for i in range(n)]
+    assert [match['id'] for match in matches] == match_ids
+    assert len(set(match_ids)) == n
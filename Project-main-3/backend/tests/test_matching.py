@@ -0,0 +1,242 @@
+"""
+Equivalence tests for the matching engines.
+
+Every engine must form exactly the groups of the original greedy algorithm,
+which is kept here as a plain reference implementation.
+"""
+import copy
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from match_cache import MatchCache
+from matching import (
+    MATCHING_ENGINES, MIN_GROUP_COMPATIBILITY, compute_compatibility_score, compute_group_metrics,
+    match_students, place_submission
+)
+from scorer import DEFAULT_WEIGHTS, MatchingWeights
+
+CUSTOM_WEIGHTS = MatchingWeights(availability=0.3, preference=0.5, location=0.2)
+
+
+def reference_match(submissions: List[Dict[str, Any]], min_group_size: int, max_group_size: int,
+                    weights: MatchingWeights = DEFAULT_WEIGHTS) -> Tuple[List[List[Dict[str, Any]]], List[str]]:
+    """The original greedy matcher: score every remaining candidate against the group."""
+    course_groups: Dict[str, List[Dict[str, Any]]] = {}
+    for submission in submissions:
+        course_groups.setdefault(submission.get('course', 'UNKNOWN'), []).append(submission)
+
+    groups = []
+    unmatched = []
+    for students in course_groups.values():
+        remaining = students.copy()
+        while len(remaining) >= min_group_size:
+            group = [remaining.pop(0)]
+            group_ids = {group[0].get('id')}
+            while len(group) < max_group_size and remaining:
+                best_score = -1
+                best_index = -1
+                for index, candidate in enumerate(remaining):
+                    if candidate.get('id') in group_ids:
+                        continue
+                    score = sum(
+                        compute_compatibility_score(member, candidate, weights.availability,
+                                                    weights.preference, weights.location)
+                        for member in group
+                    ) / len(group)
+                    if score > best_score:
+                        best_score = score
+                        best_index = index
+                if best_index < 0 or best_score < MIN_GROUP_COMPATIBILITY:
+                    break
+                group_ids.add(remaining[best_index].get('id'))
+                group.append(remaining.pop(best_index))
+            if len(group) >= min_group_size:
+                groups.append(group)
+            else:
+                unmatched.extend(group)
+        unmatched.extend(remaining)
+    return groups, [student.get('id') for student in unmatched]
+
+
+def summarize(groups: List[Dict[str, Any]], unmatched: List[Dict[str, Any]]):
+    """Comparable view of a match_students result."""
+    return (
+        [(group['course'], group['student_ids'], group['avg_compatibility'],
+          group['availability_overlap'], group['preference_alignment']) for group in groups],
+        [student.get('id') for student in unmatched]
+    )
+
+
+def summarize_reference(groups: List[List[Dict[str, Any]]], unmatched: List[str],
+                        weights: MatchingWeights = DEFAULT_WEIGHTS):
+    """Comparable view of a reference_match result."""
+    summary = []
+    for group in groups:
+        metrics = compute_group_metrics(group, weights.availability, weights.preference, weights.location)
+        summary.append((group[0].get('course', 'UNKNOWN'), [student.get('id') for student in group],
+                        metrics['avg_compatibility'], metrics['availability_overlap'],
+                        metrics['preference_alignment']))
+    return summary, unmatched
+
+
+@pytest.mark.parametrize('engine', sorted(MATCHING_ENGINES))
+@pytest.mark.parametrize('weights', [DEFAULT_WEIGHTS, CUSTOM_WEIGHTS], ids=['default', 'custom'])
+@pytest.mark.parametrize('seed', range(20))
+def test_engine_matches_reference(engine, weights, seed, make_submissions):
+    submissions = make_submissions(seed, 10 + 4 * seed)
+    expected = summarize_reference(*reference_match(copy.deepcopy(submissions), 3, 5, weights), weights)
+
+    groups, unmatched = match_students(copy.deepcopy(submissions), 3, 5, engine=engine, weights=weights)
+
+    assert summarize(groups, unmatched) == expected
+
+
+@pytest.mark.parametrize('engine', sorted(MATCHING_ENGINES))
+def test_engine_honors_course_weights(engine, make_submissions):
+    submissions = make_submissions(7, 90)
+    course_weights = {'CIS1001': CUSTOM_WEIGHTS}
+    expected = {}
+    for course in ('CIS1000', 'CIS1001', 'CIS1002'):
+        students = [s for s in submissions if s['course'] == course]
+        weights = course_weights.get(course, DEFAULT_WEIGHTS)
+        expected[course] = summarize_reference(*reference_match(students, 3, 5, weights), weights)
+
+    groups, unmatched = match_students(copy.deepcopy(submissions), 3, 5, engine=engine,
+                                       course_weights=course_weights)
+
+    for course, (expected_groups, expected_unmatched) in expected.items():
+        actual_groups, _ = summarize([g for g in groups if g['course'] == course], [])
+        assert actual_groups == expected_groups
+        assert [s['id'] for s in unmatched if s['course'] == course] == expected_unmatched
+
+
+def test_parallel_workers_match_sequential(make_submissions):
+    submissions = make_submissions(21, 150)
+    sequential = match_students(copy.deepcopy(submissions), 3, 5)
+
+    parallel = match_students(copy.deepcopy(submissions), 3, 5, workers=3, parallel_min_course_size=10)
+
+    assert summarize(*parallel) == summarize(*sequential)
+
+
+def test_place_submission_joins_most_compatible_open_group():
+    def student(sid, slots, preference):
+        return {'id': sid, 'course': 'CIS1200', 'availability': slots,
+                'study_preference': preference, 'location_preference': 'In-person'}
+
+    morning = [student(f"m{i}", ['Monday 10am-12pm'], 'PSets') for i in range(3)]
+    evening = [student(f"e{i}", ['Friday 4pm-6pm'], 'Exam Prep') for i in range(3)]
+    submissions_by_id = {s['id']: s for s in morning + evening}
+    open_groups = [
+        {'id': 'evening', 'student_ids': [s['id'] for s in evening]},
+        {'id': 'morning', 'student_ids': [s['id'] for s in morning]},
+    ]
+    newcomer = student('new', ['Monday 10am-12pm'], 'PSets')
+
+    updated, new_groups = place_submission(newcomer, open_groups, [], submissions_by_id, 3, 5)
+
+    assert new_groups == []
+    assert [group['id'] for group in updated] == ['morning']
+    assert updated[0]['student_ids'] == ['m0', 'm1', 'm2', 'new']
+    assert updated[0]['avg_compatibility'] == 1.0
+
+
+@pytest.mark.parametrize('engine', sorted(MATCHING_ENGINES))
+def test_place_submission_matches_full_waiting_pool(engine, make_submissions):
+    waiting = make_submissions(5, 30, courses=1)
+    newcomer = waiting.pop()
+    submissions_by_id = {s['id']: s for s in waiting}
+
+    updated, new_groups = place_submission(newcomer, [], waiting, submissions_by_id, 3, 5, engine=engine)
+
+    expected, _ = match_students(waiting + [newcomer], 3, 5, engine=engine)
+    assert updated == []
+    assert summarize(new_groups, []) == summarize(expected, [])
+
+
+def test_place_submission_rejects_unknown_engine(make_submissions):
+    newcomer = make_submissions(0, 1)[0]
+    with pytest.raises(ValueError):
+        place_submission(newcomer, [], [], {}, engine='unknown')
+
+
+@pytest.mark.parametrize('engine', sorted(MATCHING_ENGINES))
+def test_refinement_with_duplicate_ids_leaves_groups_unrefined(engine, make_submissions):
+    submissions = make_submissions(4, 60, courses=1)
+    submissions[1]['id'] = submissions[0]['id']
+    stats = {}
+
+    refined = match_students(copy.deepcopy(submissions), 3, 5, engine=engine,
+                             refine_time_budget=1.0, stats=stats)
+
+    course_stats = next(iter(stats['courses'].values()))
+    assert course_stats['refinement'] == {'skipped': 'duplicate ids'}
+    assert summarize(*refined) == summarize(*match_students(copy.deepcopy(submissions), 3, 5, engine=engine))
+
+
+def test_refinement_keeps_students_and_improves_objective(make_submissions):
+    submissions = make_submissions(6, 80, courses=1)
+    stats = {}
+
+    groups, unmatched = match_students(copy.deepcopy(submissions), 3, 5, refine_time_budget=5.0, stats=stats)
+
+    refinement = next(iter(stats['courses'].values()))['refinement']
+    assert refinement['objective_after'] >= refinement['objective_before']
+    placed = sorted(sid for group in groups for sid in group['student_ids']) + [s['id'] for s in unmatched]
+    assert sorted(placed) == sorted(s['id'] for s in submissions)
+    assert all(3 <= group['group_size'] <= 5 for group in groups)
+
+
+@pytest.mark.parametrize('engine', sorted(MATCHING_ENGINES))
+def test_cache_round_trip(engine, make_submissions):
+    submissions = make_submissions(11, 60)
+    cache = MatchCache()
+    first_stats = {}
+    second_stats = {}
+
+    first = match_students(copy.deepcopy(submissions), 3, 5, engine=engine, cache=cache, stats=first_stats)
+    second = match_students(copy.deepcopy(submissions), 3, 5, engine=engine, cache=cache, stats=second_stats)
+
+    assert summarize(*second) == summarize(*first)
+    assert not any(course.get('cached') for course in first_stats['courses'].values())
+    assert all(course.get('cached') for course in second_stats['courses'].values())
+
+
+def test_cache_misses_on_changed_input(make_submissions):
+    submissions = make_submissions(12, 40, courses=2)
+    cache = MatchCache()
+    match_students(copy.deepcopy(submissions), 3, 5, cache=cache)
+
+    changed = copy.deepcopy(submissions)
+    changed[0]['availability'] = ['Saturday 10am-12pm']
+    stats = {}
+    groups, unmatched = match_students(copy.deepcopy(changed), 3, 5, cache=cache, stats=stats)
+
+    changed_course = changed[0]['course']
+    assert not stats['courses'][changed_course].get('cached')
+    assert summarize(groups, unmatched) == summarize(*match_students(copy.deepcopy(changed), 3, 5))
+
+
+def test_cache_eviction_does_not_change_result(make_submissions):
+    submissions = make_submissions(13, 90)
+    uncached = match_students(copy.deepcopy(submissions), 3, 5)
+    # Room for two of the three courses' results, so runs mix hits and evictions
+    cache = MatchCache(max_bytes=8 * 1024)
+
+    for _ in range(3):
+        result = match_students(copy.deepcopy(submissions), 3, 5, cache=cache)
+        assert summarize(*result) == summarize(*uncached)
+        assert cache.current_bytes <= cache.max_bytes
+    assert cache.hits > 0
+
+
+def test_pruning_does_not_change_result(make_submissions):
+    submissions = make_submissions(3, 200, courses=1)
+    stats = {}
+
+    groups, unmatched = match_students(copy.deepcopy(submissions), 3, 5, engine='greedy', stats=stats)
+
+    pruning = next(iter(stats['courses'].values()))['pruning']
+    assert pruning['pruned'] > 0
+    assert summarize(groups, unmatched) == summarize_reference(*reference_match(submissions, 3, 5))
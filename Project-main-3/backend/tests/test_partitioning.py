@@ -0,0 +1,56 @@
+"""
+Partitioned matching: buckets cover every student within the size limit.
+"""
+import copy
+
+import pytest
+
+from matching import MATCHING_ENGINES, match_students
+from partitioning import location_blocks, partition_course
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('max_bucket_size', [1, 7, 40, 500])
+def test_buckets_cover_every_student_within_size(seed, max_bucket_size, make_submissions):
+    students = make_submissions(seed, 150, courses=1)
+
+    buckets = partition_course(students, max_bucket_size)
+
+    assert sorted(i for bucket in buckets for i in bucket) == list(range(len(students)))
+    assert all(0 < len(bucket) <= max_bucket_size for bucket in buckets)
+    assert all(bucket == sorted(bucket) for bucket in buckets)
+
+
+def test_identical_availability_is_split_by_position():
+    students = [{'id': f"s{i}", 'availability': ['Monday 10am-12pm'], 'location_preference': 'Virtual'}
+                for i in range(10)]
+
+    buckets = partition_course(students, 3)
+
+    assert sorted(i for bucket in buckets for i in bucket) == list(range(10))
+    assert all(len(bucket) <= 3 for bucket in buckets)
+
+
+def test_location_blocks_never_mix_in_person_and_virtual(make_submissions):
+    students = make_submissions(2, 80, courses=1)
+
+    for block in location_blocks(students):
+        locations = {(students[i].get('location_preference') or '').strip() for i in block}
+        assert not {'In-person', 'Virtual'} <= locations
+
+
+def test_partition_rejects_empty_buckets():
+    with pytest.raises(ValueError):
+        partition_course([], 0)
+
+
+@pytest.mark.parametrize('engine', sorted(MATCHING_ENGINES))
+def test_partitioned_matching_places_each_student_once(engine, make_submissions):
+    submissions = make_submissions(17, 240, courses=1)
+
+    groups, unmatched = match_students(copy.deepcopy(submissions), 3, 5, engine=engine,
+                                       partition_min_course_size=100, max_bucket_size=40)
+
+    placed = [sid for group in groups for sid in group['student_ids']] + [s['id'] for s in unmatched]
+    assert sorted(placed) == sorted(s['id'] for s in submissions)
+    assert all(3 <= group['group_size'] <= 5 for group in groups)
@@ -0,0 +1,67 @@
+"""
+Invariant tests for local-search refinement.
+"""
+import numpy as np
+import pytest
+
+from refinement import refine_course_groups, refine_groups
+
+
+def random_scores(rng: np.random.Generator, n: int) -> np.ndarray:
+    scores = rng.random((n, n))
+    scores = (scores + scores.T) / 2
+    np.fill_diagonal(scores, 1.0)
+    return scores
+
+
+def objective(groups, scores: np.ndarray) -> float:
+    averages = []
+    for group in groups:
+        block = scores[np.ix_(group, group)]
+        pairs = len(group) * (len(group) - 1) / 2
+        averages.append((block.sum() - np.trace(block)) / 2 / pairs)
+    return sum(averages) / len(averages)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_refine_groups_keeps_members_and_bounds(seed):
+    rng = np.random.default_rng(seed)
+    n = 40
+    scores = random_scores(rng, n)
+    order = rng.permutation(n).tolist()
+    sizes = [3, 4, 5, 5, 3, 4, 5, 3, 4, 4]
+    groups = []
+    for size in sizes:
+        groups.append(order[:size])
+        order = order[size:]
+
+    refined, stats = refine_groups(groups, scores, 3, 5, time_budget=5.0)
+
+    assert len(refined) == len(groups)
+    assert sorted(i for group in refined for i in group) == sorted(i for group in groups for i in group)
+    assert all(3 <= len(group) <= 5 for group in refined)
+    assert stats['objective_after'] >= stats['objective_before']
+    assert stats['objective_after'] == pytest.approx(objective(refined, scores), abs=1e-6)
+    assert not stats['timed_out']
+
+
+def test_refine_groups_stops_at_local_optimum():
+    scores = random_scores(np.random.default_rng(0), 20)
+    groups = [list(range(start, start + 4)) for start in range(0, 20, 4)]
+
+    refined, _ = refine_groups(groups, scores, 3, 5, time_budget=5.0)
+    again, stats = refine_groups(refined, scores, 3, 5, time_budget=5.0)
+
+    assert again == refined
+    assert stats['swaps'] == stats['moves'] == 0
+
+
+def test_refine_course_groups_skips_duplicate_ids():
+    students = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}, {'id': 'a'}, {'id': 'd'}, {'id': 'e'}]
+    groups = [[0, 1, 2], [3, 4, 5]]
+    scores = random_scores(np.random.default_rng(1), len(students))
+
+    refined, stats = refine_course_groups(students, groups, scores, 3, 5, time_budget=5.0)
+
+    assert refined == groups
+    assert stats == {'skipped': 'duplicate ids'}
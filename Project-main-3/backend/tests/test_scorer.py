@@ -0,0 +1,51 @@
+"""
+MatchingWeights validation and WeightedScorer agreement with the dict scorer.
+"""
+import pytest
+
+from matching import compute_compatibility_score, compute_group_metrics
+from scorer import DEFAULT_WEIGHTS, MatchingWeights, WeightedScorer
+
+
+def test_from_dict_fills_missing_terms_from_base():
+    base = MatchingWeights(availability=0.5, preference=0.3, location=0.2)
+
+    weights = MatchingWeights.from_dict({'location': 0, 'availability': 1}, base=base)
+
+    assert weights == MatchingWeights(availability=1.0, preference=0.3, location=0.0)
+
+
+@pytest.mark.parametrize('data', [
+    {'availability': -0.1},
+    {'preference': '0.3'},
+    {'location': None},
+    {'availability': True},
+    {'preference': float('nan')},
+    {'location': float('inf')},
+    {'distance': 0.5},
+])
+def test_from_dict_rejects_invalid_weights(data):
+    with pytest.raises(ValueError):
+        MatchingWeights.from_dict(data)
+
+
+def test_constructor_rejects_negative_weights():
+    with pytest.raises(ValueError):
+        MatchingWeights(availability=0.6, preference=-0.25, location=0.15)
+
+
+@pytest.mark.parametrize('weights', [DEFAULT_WEIGHTS, MatchingWeights(0.2, 0.0, 0.8)])
+def test_weighted_scorer_matches_dict_scoring(weights, make_submissions):
+    students = make_submissions(9, 25, courses=1)
+    scorer = WeightedScorer(students, weights)
+
+    for i in range(len(students)):
+        assert scorer.scores(i, list(range(len(students)))) == [
+            compute_compatibility_score(students[i], other, weights.availability,
+                                        weights.preference, weights.location)
+            for other in students
+        ]
+    group = [0, 3, 5, 7]
+    assert scorer.group_metrics(group) == compute_group_metrics(
+        [students[i] for i in group], weights.availability, weights.preference, weights.location
+    )
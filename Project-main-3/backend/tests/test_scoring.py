@@ -0,0 +1,76 @@
+"""
+Vectorized GroupMatcher scoring equals the pairwise calculate_compatibility.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from backend.models.submission import Submission
+from backend.src.aggregation.scoring import CompatibilityScorer
+
+SLOTS = ['Mon AM', 'Mon PM', 'Tue AM', 'Tue PM', 'Wed AM', 'Thu PM']
+STYLES = ['visual', 'Visual', 'textual', 'auditory', '', None]
+GOALS = ['exam_prep', 'EXAM_PREP', 'problem_sets', 'concept_review', '', None]
+
+
+def random_students(seed: int, n: int):
+    rng = random.Random(seed)
+    students = []
+    for _ in range(n):
+        availability = rng.sample(SLOTS, rng.randint(0, 4))
+        if availability and rng.random() < 0.2:
+            # Duplicates count toward the list length, as in the pairwise score
+            availability.append(availability[0])
+        students.append({
+            'availability': availability,
+            'study_style': rng.choice(STYLES),
+            'goal': rng.choice(GOALS),
+        })
+    return students
+
+
+def pairwise(scorer: CompatibilityScorer, students) -> np.ndarray:
+    return np.array([[scorer.calculate_compatibility(a, b) for b in students] for a in students])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matrix_equals_pairwise_scores(seed):
+    scorer = CompatibilityScorer()
+    students = random_students(seed, 30)
+
+    matrix = scorer.calculate_compatibility_matrix(students)
+
+    expected = pairwise(scorer, students)
+    off_diagonal = ~np.eye(len(students), dtype=bool)
+    assert matrix.shape == (30, 30)
+    assert np.array_equal(matrix[off_diagonal], expected[off_diagonal])
+
+
+def test_matrix_accepts_submission_objects():
+    scorer = CompatibilityScorer()
+    students = random_students(9, 12)
+    submissions = [Submission(pennkey=f"p{i}", availability=s['availability'], study_style=s['study_style'] or '',
+                              goal=s['goal'] or '') for i, s in enumerate(students)]
+
+    matrix = scorer.calculate_compatibility_matrix(submissions)
+
+    expected = pairwise(scorer, [s.to_dict() for s in submissions])
+    off_diagonal = ~np.eye(len(students), dtype=bool)
+    assert np.array_equal(matrix[off_diagonal], expected[off_diagonal])
+
+
+def test_matrix_of_one_student():
+    assert CompatibilityScorer().calculate_compatibility_matrix(random_students(0, 1)).shape == (1, 1)
+
+
+@pytest.mark.parametrize('columns', [None, slice(4, None), np.array([0, 5, 2, 29])])
+def test_rows_equal_matrix_rows(columns):
+    scorer = CompatibilityScorer()
+    students = random_students(4, 30)
+    encoded = scorer.encode_students(students)
+
+    rows = scorer.calculate_compatibility_rows(encoded, 3, 17, columns)
+
+    expected = pairwise(scorer, students)[3:17]
+    assert np.array_equal(rows, expected if columns is None else expected[:, columns])
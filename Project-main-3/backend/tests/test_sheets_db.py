@@ -0,0 +1,163 @@
+"""
+SheetsDB tests, run against in-memory worksheets.
+"""
+import random
+import time
+
+import pytest
+
+
+def save_random_submissions(database, seed, n=30):
+    rng = random.Random(seed)
+    for _ in range(n):
+        database.save_submission({'pennkey': f"user{rng.randrange(6)}", 'course': f"CIS{rng.randrange(3)}",
+                                  'name': rng.choice(['', 'Ada', 'Grace'])})
+    return database.get_all_submissions()
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_uncached_queries_read_only_the_needed_columns(sheets_db, seed):
+    database = sheets_db(cache_ttl=0)
+    submissions = save_random_submissions(database, seed)
+    worksheet = database.submissions_sheet
+    worksheet.calls.clear()
+
+    for course in ('CIS0', 'CIS1', 'CIS2', 'NONE'):
+        assert database.get_submissions_by_course(course) == [s for s in submissions if s['course'] == course]
+    for pennkey in [f"user{i}" for i in range(6)] + ['nobody']:
+        assert database.get_submissions_by_pennkey(pennkey) == \
+            [s for s in submissions if s['pennkey'] == pennkey]
+
+    assert worksheet.calls['get_all_records'] == 0
+    assert worksheet.calls['batch_get'] == 4
+    assert worksheet.calls['col_values'] == 7
+
+
+def test_course_query_skips_rows_without_a_course(sheets_db):
+    database = sheets_db(cache_ttl=0)
+    database.save_submission({'pennkey': 'alice'})
+    database.save_submission({'pennkey': 'bob', 'course': 'CIS1200'})
+
+    assert [s['pennkey'] for s in database.get_submissions_by_course('CIS1200')] == ['bob']
+
+
+@pytest.mark.parametrize('cache_ttl', [0, 30.0])
+def test_find_submission_returns_first_saved(sheets_db, cache_ttl):
+    database = sheets_db(cache_ttl=cache_ttl)
+    first = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+    database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+    database.save_submission({'pennkey': 'alice', 'course': 'CIS1210'})
+
+    assert database.find_submission('alice', 'CIS1200')['id'] == first
+    assert database.find_submission('alice', 'CIS1600') is None
+    assert database.find_submission('bob', 'CIS1200') is None
+
+
+def test_save_matches_appends_one_batch_in_order(sheets_db):
+    database = sheets_db()
+    matches = [{'course': 'CIS1200', 'student_ids': [f"s{i}", f"t{i}"]} for i in range(7)]
+
+    match_ids = database.save_matches(matches)
+
+    worksheet = database.matches_sheet
+    assert worksheet.calls['append_rows'] == 1
+    assert worksheet.calls['append_row'] == 0
+    assert [row[0] for row in worksheet.rows[1:]] == match_ids
+    assert [match['id'] for match in matches] == match_ids
+    assert [database.get_match(match_id)['student_ids'] for match_id in match_ids] == \
+        [match['student_ids'] for match in matches]
+
+
+def test_save_matches_without_matches_writes_nothing(sheets_db):
+    database = sheets_db()
+
+    assert database.save_matches([]) == []
+    assert not database.matches_sheet.calls
+
+
+def test_reads_share_one_snapshot(sheets_db):
+    database = sheets_db()
+    submission_id = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+    match_id = database.save_match({'course': 'CIS1200', 'student_ids': [submission_id]})
+
+    for _ in range(3):
+        assert database.get_submission(submission_id)['pennkey'] == 'alice'
+        assert [s['id'] for s in database.get_submissions_by_course('CIS1200')] == [submission_id]
+        assert database.find_submission('alice', 'CIS1200')['id'] == submission_id
+        assert [m['id'] for m in database.get_matches_by_student(submission_id)] == [match_id]
+        assert [m['id'] for m in database.get_matches_by_course('CIS1200')] == [match_id]
+
+    assert database.submissions_sheet.calls['get_all_records'] == 1
+    assert database.matches_sheet.calls['get_all_records'] == 1
+
+
+def test_snapshot_is_reloaded_after_ttl(sheets_db):
+    database = sheets_db(cache_ttl=0.05)
+    database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+    database.get_all_submissions()
+    # A row added by someone else is only seen once the snapshot expires
+    database.submissions_sheet.rows.append(list(database.submissions_sheet.rows[1]))
+    database.submissions_sheet.rows[-1][0] = 'external'
+
+    assert len(database.get_all_submissions()) == 1
+    time.sleep(0.1)
+    assert len(database.get_all_submissions()) == 2
+    assert database.submissions_sheet.calls['get_all_records'] == 2
+
+
+def test_writes_invalidate_the_snapshot(sheets_db):
+    database = sheets_db()
+    first = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+    assert [s['id'] for s in database.get_submissions_by_pennkey('alice')] == [first]
+
+    second = database.save_submission({'pennkey': 'alice', 'course': 'CIS1210'})
+    assert [s['id'] for s in database.get_submissions_by_pennkey('alice')] == [first, second]
+
+    match_id = database.save_match({'course': 'CIS1200', 'student_ids': ['a', 'b']})
+    assert database.get_match(match_id)['student_ids'] == ['a', 'b']
+    database.update_match(match_id, {'student_ids': ['a', 'c']})
+    assert database.get_matches_by_student('b') == []
+    assert [m['id'] for m in database.get_matches_by_student('c')] == [match_id]
+
+
+def test_snapshot_read_across_a_write_is_not_cached(sheets_db):
+    database = sheets_db()
+    worksheet = database.matches_sheet
+    get_all_records = worksheet.get_all_records
+    written = []
+
+    def racing_get_all_records():
+        records = get_all_records()
+        # Another request writes after this read but before the snapshot is stored
+        if not written:
+            written.append(database.save_match({'course': 'CIS1200', 'student_ids': ['a']}))
+        return records
+
+    worksheet.get_all_records = racing_get_all_records
+
+    assert database.get_matches_by_course('CIS1200') == []
+    assert [m['id'] for m in database.get_matches_by_course('CIS1200')] == written
+    assert worksheet.calls['get_all_records'] == 2
+
+
+def test_update_match_reads_row_numbers_fresh(sheets_db):
+    database = sheets_db()
+    match_id = database.save_match({'course': 'CIS1200', 'student_ids': ['a']})
+    database.get_match(match_id)
+    # Rows inserted by hand shift the match down; the cached snapshot does not know
+    database.matches_sheet.rows.insert(1, ['other', '[]', '[]', '{"id": "other"}'])
+
+    database.update_match(match_id, {'student_ids': ['a', 'b']})
+
+    assert database.matches_sheet.rows[1][0] == 'other'
+    assert database.get_match(match_id)['student_ids'] == ['a', 'b']
+
+
+def test_zero_ttl_disables_caching(sheets_db):
+    database = sheets_db(cache_ttl=0)
+    submission_id = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+
+    for _ in range(3):
+        assert database.get_submission(submission_id)['id'] == submission_id
+
+    assert database.submissions_sheet.calls['get_all_records'] == 3
@@ -0,0 +1,164 @@
+"""
+SheetsDB write-behind buffer tests, run against in-memory worksheets.
+"""
+import signal
+import threading
+import time
+
+import pytest
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def written_ids(database):
+    return [row[0] for row in database.submissions_sheet.rows[1:]]
+
+
+def test_flushes_when_buffer_reaches_flush_size(sheets_db):
+    database = sheets_db(write_behind=True, flush_size=3, flush_interval=60)
+
+    ids = [database.save_submission({'pennkey': f"user{i}", 'course': 'CIS1200'}) for i in range(2)]
+    time.sleep(0.1)
+    assert written_ids(database) == []
+
+    ids.append(database.save_submission({'pennkey': 'user2', 'course': 'CIS1200'}))
+    assert wait_for(lambda: written_ids(database) == ids)
+    assert database.submissions_sheet.calls['append_rows'] == 1
+    assert database.submissions_sheet.calls['append_row'] == 0
+
+
+def test_flushes_when_oldest_submission_reaches_flush_interval(sheets_db):
+    database = sheets_db(write_behind=True, flush_size=100, flush_interval=0.1)
+
+    submission_id = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+    assert written_ids(database) == []
+
+    assert wait_for(lambda: written_ids(database) == [submission_id])
+
+
+def test_full_buffer_blocks_then_fails(sheets_db):
+    database = sheets_db(write_behind=True, flush_size=100, flush_interval=60,
+                         max_pending=2, pending_timeout=0.2)
+    ids = [database.save_submission({'pennkey': f"user{i}", 'course': 'CIS1200'}) for i in range(2)]
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError):
+        database.save_submission({'pennkey': 'late', 'course': 'CIS1200'})
+
+    assert time.monotonic() - started >= 0.2
+    assert [s['id'] for s in database.get_all_submissions()] == ids
+
+
+def test_full_buffer_waits_for_a_flush(sheets_db):
+    database = sheets_db(write_behind=True, flush_size=100, flush_interval=0.2,
+                         max_pending=2, pending_timeout=2.0)
+    ids = [database.save_submission({'pennkey': f"user{i}", 'course': 'CIS1200'}) for i in range(3)]
+
+    assert written_ids(database) == ids[:2]
+    database.close()
+    assert written_ids(database) == ids
+
+
+def test_failed_flush_keeps_submissions_buffered(sheets_db):
+    database = sheets_db(write_behind=True, flush_size=1, flush_interval=0.05)
+    worksheet = database.submissions_sheet
+    append_rows = worksheet.append_rows
+    failures = []
+
+    def failing_append_rows(rows):
+        if len(failures) < 2:
+            failures.append(len(rows))
+            raise IOError('quota exceeded')
+        append_rows(rows)
+
+    worksheet.append_rows = failing_append_rows
+    submission_id = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+
+    assert wait_for(lambda: written_ids(database) == [submission_id])
+    assert failures == [1, 1]
+
+
+def test_reads_include_submissions_being_flushed(sheets_db):
+    database = sheets_db(write_behind=True, flush_size=2, flush_interval=60)
+    worksheet = database.submissions_sheet
+    append_rows = worksheet.append_rows
+    appending = threading.Event()
+    release = threading.Event()
+
+    def slow_append_rows(rows):
+        appending.set()
+        release.wait(5)
+        append_rows(rows)
+
+    worksheet.append_rows = slow_append_rows
+    ids = [database.save_submission({'pennkey': 'alice', 'course': f"CIS120{i}"}) for i in range(2)]
+    assert appending.wait(2)
+    # Buffered after the flush started
+    ids.append(database.save_submission({'pennkey': 'alice', 'course': 'CIS1202'}))
+
+    try:
+        assert written_ids(database) == []
+        assert [s['id'] for s in database.get_all_submissions()] == ids
+        assert [s['id'] for s in database.get_submissions_by_pennkey('alice')] == ids
+        assert [s['id'] for s in database.get_submissions_by_course('CIS1201')] == ids[1:2]
+        assert database.get_submission(ids[0])['course'] == 'CIS1200'
+        assert database.find_submission('alice', 'CIS1202')['id'] == ids[2]
+    finally:
+        release.set()
+
+    assert wait_for(lambda: written_ids(database) == ids[:2])
+    database.close()
+    assert [s['id'] for s in database.get_all_submissions()] == ids
+
+
+def test_close_flushes_and_stops_buffering(sheets_db):
+    database = sheets_db(write_behind=True, flush_size=100, flush_interval=60)
+    ids = [database.save_submission({'pennkey': f"user{i}", 'course': 'CIS1200'}) for i in range(3)]
+
+    database.close()
+
+    assert written_ids(database) == ids
+    assert not database._flush_thread.is_alive()
+    # Later submissions are written straight through
+    ids.append(database.save_submission({'pennkey': 'late', 'course': 'CIS1200'}))
+    assert written_ids(database) == ids
+    database.close()
+    assert database.submissions_sheet.calls['append_rows'] == 1
+
+
+def test_sigterm_flushes_then_exits(sheets_db):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    database = sheets_db(write_behind=True, flush_size=100, flush_interval=60)
+    submission_id = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+
+    with pytest.raises(SystemExit) as exit_info:
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+
+    assert exit_info.value.code == 128 + signal.SIGTERM
+    assert written_ids(database) == [submission_id]
+
+
+def test_sigterm_runs_previous_handler_after_flushing(sheets_db):
+    calls = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: calls.append(written_ids(database)))
+    database = sheets_db(write_behind=True, flush_size=100, flush_interval=60)
+    submission_id = database.save_submission({'pennkey': 'alice', 'course': 'CIS1200'})
+
+    signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+
+    assert calls == [[submission_id]]
+
+
+def test_sigterm_handler_only_installed_with_write_behind(sheets_db):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    sheets_db()
+
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL